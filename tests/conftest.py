@@ -1,6 +1,8 @@
 import os
 import sys
 
+import pytest
+
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(root_dir)
 
@@ -31,3 +33,14 @@ pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def test_settings(settings):
+    """Настройки тестов, как у core.testing.TestRunner: фоновые
+    задачи выполняются сразу (воркеров нет), N+1 роняет тест.
+    """
+    from core.testing import REPEAT_LIMIT
+    settings.JOBS_EAGER = True
+    settings.QUERY_REPEAT_LIMIT = settings.QUERY_REPEAT_LIMIT or REPEAT_LIMIT
+    settings.QUERY_REPEAT_ACTION = 'raise'
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'args', 'status', 'attempts', 'run_at')
+    search_fields = ('task', 'key')
+    list_filter = ('status', 'task')
+    empty_value_display = '-пусто-'
@@ -0,0 +1,217 @@
+"""Бэкенд кэша для серверов с протоколом Redis (RESP).
+
+Клиент без сторонних зависимостей: одно постоянное соединение
+на поток, пакетная отправка команд в set_many/delete_many.
+Целые числа хранятся как есть, чтобы работал INCRBY,
+остальные значения - в pickle.
+"""
+import pickle
+import socket
+import threading
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class RespError(Exception):
+    pass
+
+
+class RespConnection:
+    def __init__(self, host, port, timeout):
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def send(self, *commands):
+        chunks = []
+        for command in commands:
+            chunks.append(b'*%d\r\n' % len(command))
+            for arg in command:
+                if not isinstance(arg, bytes):
+                    arg = str(arg).encode()
+                chunks.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self.sock.sendall(b''.join(chunks))
+
+    def read(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError('Сервер кэша закрыл соединение')
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode()
+        if kind == b'-':
+            raise RespError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            return self.reader.read(length + 2)[:-2]
+        if kind == b'*':
+            length = int(rest)
+            if length < 0:
+                return None
+            return [self.read() for _ in range(length)]
+        raise RespError(f'Неизвестный ответ сервера: {line!r}')
+
+
+class RedisCache(BaseCache):
+    def __init__(self, server, params):
+        super().__init__(params)
+        host, _, port = server.rpartition(':')
+        self._address = (host or '127.0.0.1', int(port or 6379))
+        options = params.get('OPTIONS', {})
+        self._db = options.get('DB', 0)
+        self._password = options.get('PASSWORD')
+        self._socket_timeout = options.get('SOCKET_TIMEOUT', 1)
+        self._local = threading.local()
+
+    def _connect(self):
+        connection = RespConnection(*self._address, self._socket_timeout)
+        setup = []
+        if self._password:
+            setup.append(('AUTH', self._password))
+        if self._db:
+            setup.append(('SELECT', self._db))
+        if setup:
+            connection.send(*setup)
+            for _ in setup:
+                connection.read()
+        return connection
+
+    def _execute(self, *commands):
+        """Отправляет команды пакетом и возвращает список ответов.
+
+        При обрыве соединения один раз переподключается.
+        """
+        for attempt in (1, 2):
+            connection = getattr(self._local, 'connection', None)
+            try:
+                if connection is None:
+                    connection = self._local.connection = self._connect()
+                connection.send(*commands)
+                return [connection.read() for _ in commands]
+            except (OSError, ConnectionError):
+                self._disconnect()
+                if attempt == 2:
+                    raise
+
+    def _disconnect(self):
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if connection is not None:
+            try:
+                connection.close()
+            except OSError:
+                pass
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value).encode()
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(data):
+        if data is None:
+            return None
+        if data[:1] == b'\x80':
+            return pickle.loads(data)
+        return int(data)
+
+    def _ttl(self, timeout):
+        """Время жизни в миллисекундах или None - без срока."""
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        return max(int(timeout * 1000), 1)
+
+    def _set_command(self, key, value, timeout, *flags):
+        command = ['SET', key, self._encode(value)]
+        ttl = self._ttl(timeout)
+        if ttl is not None:
+            command += ['PX', ttl]
+        return (*command, *flags)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        reply, = self._execute(self._set_command(key, value, timeout, 'NX'))
+        return reply is not None
+
+    def get(self, key, default=None, version=None):
+        reply, = self._execute(('GET', self._key(key, version)))
+        return default if reply is None else self._decode(reply)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        self._execute(self._set_command(key, value, timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        ttl = self._ttl(timeout)
+        if ttl is None:
+            command = ('PERSIST', key)
+        else:
+            command = ('PEXPIRE', key, ttl)
+        reply, exists = self._execute(command, ('EXISTS', key))
+        return bool(reply or exists)
+
+    def delete(self, key, version=None):
+        self._execute(('DEL', self._key(key, version)))
+
+    def has_key(self, key, version=None):
+        reply, = self._execute(('EXISTS', self._key(key, version)))
+        return bool(reply)
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        exists, = self._execute(('EXISTS', key))
+        if not exists:
+            raise ValueError(f"Key '{key}' not found")
+        try:
+            value, = self._execute(('INCRBY', key, delta))
+        except RespError:
+            raise ValueError(f"Key '{key}' is not an integer")
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        made = [self._key(key, version) for key in keys]
+        values, = self._execute(('MGET', *made))
+        return {
+            key: self._decode(value)
+            for key, value in zip(keys, values) if value is not None
+        }
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if data:
+            self._execute(*(
+                self._set_command(self._key(key, version), value, timeout)
+                for key, value in data.items()
+            ))
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._execute(('DEL', *keys))
+
+    def clear(self):
+        self._execute(('FLUSHDB',))
+
+    def close(self, **kwargs):
+        # соединение переиспользуется между запросами
+        pass
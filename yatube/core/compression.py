@@ -0,0 +1,91 @@
+"""Сжатие ответов brotli или gzip.
+
+Кодировка выбирается по Accept-Encoding с учётом q: brotli,
+если установлен пакет brotli и клиент его принимает, иначе gzip.
+Потоковый ответ сжимается по частям, и каждая часть сразу
+сбрасывается клиенту, чтобы поток не копился в компрессоре.
+"""
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml)|image/svg\+xml)'
+)
+_TOKEN = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?')
+
+
+def available():
+    """Кодировки в порядке предпочтения сервера."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding, encodings=None):
+    """Кодировка для заголовка Accept-Encoding или None.
+
+    encodings - кандидаты в порядке предпочтения сервера,
+    по умолчанию available().
+    """
+    accepted = {}
+    for part in accept_encoding.split(','):
+        match = _TOKEN.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2) or 1)
+        except ValueError:
+            continue
+        accepted[match.group(1).lower()] = quality
+    for encoding in available() if encodings is None else encodings:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(
+            content, quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+    return gzip.compress(
+        content, settings.COMPRESSION_GZIP_LEVEL, mtime=0
+    )
+
+
+def compress_sequence(chunks, encoding):
+    """Сжимает поток частей, сбрасывая компрессор после каждой."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(
+            quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+    # wbits 16 + MAX_WBITS - заголовок и контрольная сумма gzip
+    compressor = zlib.compressobj(
+        settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+    )
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def compressible(response):
+    """Стоит ли сжимать ответ: текстовый, ещё не сжатый и не
+    короче COMPRESSION_MIN_BYTES.
+    """
+    if response.has_header('Content-Encoding'):
+        return False
+    if not COMPRESSIBLE_TYPES.match(response.get('Content-Type', '')):
+        return False
+    return response.streaming or (
+        len(response.content) >= settings.COMPRESSION_MIN_BYTES
+    )
@@ -0,0 +1,97 @@
+"""Разбор настроек инфраструктуры из переменных окружения.
+
+Модуль импортируется из settings.py, поэтому не должен
+зависеть от настроенного Django.
+"""
+from urllib.parse import parse_qs, unquote, urlsplit
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'pylibmc': 'django.core.cache.backends.memcached.PyLibMCCache',
+    'redis': 'core.cache.RedisCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def cache_from_url(url):
+    """Настройка кэша из URL.
+
+    Примеры: locmem://, file:///var/tmp/yatube,
+    memcached://10.0.0.1:11211,10.0.0.2:11211,
+    redis://:password@127.0.0.1:6379/0?timeout=600&key_prefix=yatube
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in CACHE_BACKENDS:
+        raise ValueError(f'Неизвестный бэкенд кэша: {parts.scheme}')
+    config = {'BACKEND': CACHE_BACKENDS[parts.scheme]}
+    if parts.scheme == 'file':
+        config['LOCATION'] = unquote(parts.path)
+    elif parts.scheme in ('memcached', 'pylibmc'):
+        config['LOCATION'] = parts.netloc.split(',')
+    elif parts.scheme == 'redis':
+        host = parts.hostname or '127.0.0.1'
+        config['LOCATION'] = f'{host}:{parts.port or 6379}'
+        options = {'DB': int(parts.path.strip('/') or 0)}
+        if parts.password:
+            options['PASSWORD'] = unquote(parts.password)
+        config['OPTIONS'] = options
+    elif parts.netloc:
+        config['LOCATION'] = parts.netloc
+    query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+    if 'timeout' in query:
+        config['TIMEOUT'] = int(query['timeout'])
+    if 'key_prefix' in query:
+        config['KEY_PREFIX'] = query['key_prefix']
+    return config
+
+
+DATABASE_ENGINES = {
+    'sqlite': 'django.db.backends.sqlite3',
+    'postgres': 'django.db.backends.postgresql',
+    'postgresql': 'django.db.backends.postgresql',
+}
+# параметры URL, которые становятся ключами DATABASES, а не OPTIONS
+DATABASE_KEYS = {
+    'conn_max_age': ('CONN_MAX_AGE', int),
+    'health_checks': ('CONN_HEALTH_CHECKS', lambda value: value == 'true'),
+}
+
+
+def database_from_url(url, base_dir):
+    """Настройка базы данных из URL.
+
+    Примеры: sqlite:///db.sqlite3 (путь от base_dir),
+    sqlite:////var/lib/yatube.sqlite3?busy_timeout=5000,
+    postgres://user:password@db:5432/yatube?conn_max_age=600
+    &health_checks=true&pool=pgbouncer&sslmode=require
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in DATABASE_ENGINES:
+        raise ValueError(f'Неизвестная база данных: {parts.scheme}')
+    config = {'ENGINE': DATABASE_ENGINES[parts.scheme]}
+    query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+    for param, (key, convert) in DATABASE_KEYS.items():
+        if param in query:
+            config[key] = convert(query.pop(param))
+    if parts.scheme == 'sqlite':
+        path = unquote(parts.path)[1:]
+        config['NAME'] = path if path.startswith('/') else (
+            f'{base_dir}/{path}'
+        )
+        config['BUSY_TIMEOUT'] = int(query.pop('busy_timeout', 5000))
+        return config
+    config.update({
+        'NAME': unquote(parts.path.strip('/')),
+        'USER': unquote(parts.username or ''),
+        'PASSWORD': unquote(parts.password or ''),
+        'HOST': parts.hostname or '',
+        'PORT': str(parts.port or ''),
+    })
+    if query.pop('pool', None) == 'pgbouncer':
+        # PgBouncer в режиме транзакций не держит серверные курсоры
+        config['DISABLE_SERVER_SIDE_CURSORS'] = True
+    if query:
+        config['OPTIONS'] = query
+    return config
@@ -0,0 +1,81 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (get_conditional_response,
+                                patch_cache_control, patch_vary_headers)
+from django.utils.http import quote_etag, urlencode
+
+from . import routers
+
+# параметры запроса, которые читают страницы ленты;
+# остальные (метки рекламы и т. п.) не дают новых записей кэша
+QUERY_PARAMS = ('page', 'cursor', 'q', 'format')
+
+
+def anonymous_page_cache(page_state, params=QUERY_PARAMS):
+    """Кэширует страницу целиком для анонимных пользователей.
+
+    page_state(request, *args, **kwargs) возвращает версию
+    страницы или None, если страницы нет - тогда представление
+    вызывается как обычно. По версии считается ETag: на запрос
+    с совпадающим If-None-Match отдаётся 304 без рендеринга,
+    иначе страница берётся из кэша по ETag. Last-Modified не
+    ставится: правки и переименования не сдвигают дату последней
+    записи, и If-Modified-Since отдавал бы 304 с устаревшей
+    страницей.
+    В ключ входят только параметры запроса из params, которые
+    читает представление.
+    Авторизованные пользователи и запросы кроме GET/HEAD
+    обходят кэш, страница, прочитанная с реплики, в кэш
+    не сохраняется.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            version = page_state(request, *args, **kwargs)
+            if version is None:
+                return view(request, *args, **kwargs)
+            digest = hashlib.md5(
+                f'{_cache_path(request, params)}|{version}'.encode()
+            ).hexdigest()
+            etag = quote_etag(digest)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                key = f'anonymous-page:{digest}'
+                cached = cache.get(key)
+                if cached is not None:
+                    content, content_type = cached
+                    response = HttpResponse(content, content_type)
+                else:
+                    response = view(request, *args, **kwargs)
+                    if not _cacheable(response) or routers.used_replica():
+                        return response
+                    cache.set(
+                        key, (response.content, response['Content-Type']),
+                        settings.PAGE_CACHE_TIMEOUT
+                    )
+            response['ETag'] = etag
+            patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
+
+
+def _cacheable(response):
+    return (response.status_code == 200 and not response.streaming
+            and not response.cookies)
+
+
+def _cache_path(request, params):
+    """Путь и параметры из params в постоянном порядке."""
+    query = urlencode([
+        (name, request.GET[name]) for name in params if name in request.GET
+    ])
+    return f'{request.path}?{query}'
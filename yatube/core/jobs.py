@@ -0,0 +1,154 @@
+"""Очередь фоновых задач в базе данных.
+
+defer() ставит вызов функции в таблицу Job после коммита
+транзакции, выполняет задачи manage.py run_workers. При JOBS_EAGER
+(тесты без воркеров) функция вызывается сразу,
+в текущей транзакции, как синхронный вызов. Задача - функция модуля, аргументы
+сохраняются в JSON. Упавшая задача повторяется с паузой
+JOB_RETRY_DELAY * 2 ** (попытка - 1) секунд, после
+JOB_MAX_ATTEMPTS попыток помечается как неудавшаяся.
+Задачи с одинаковым ключом key ставятся в очередь один раз:
+выполненная задача с ключом остаётся в таблице JOB_RETENTION_DAYS
+дней (см. purge), без ключа - удаляется сразу. Неудавшаяся задача
+с ключом при повторной постановке снова ставится в очередь.
+"""
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def task_name(func):
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def defer(func, *args, key=None):
+    """Выполнить func(*args) в фоне после коммита текущей
+    транзакции; при JOBS_EAGER - сразу.
+    """
+    if settings.JOBS_EAGER:
+        _call(func, args)
+    else:
+        transaction.on_commit(lambda: enqueue(func, *args, key=key))
+
+
+def enqueue(func, *args, key=None, delay=0):
+    """Ставит задачу в очередь. Задача с ключом, который уже
+    есть в таблице, не добавляется; неудавшаяся задача с этим
+    ключом возвращается в очередь с новыми попытками.
+    """
+    run_at = timezone.now() + timedelta(seconds=delay)
+    task, args = task_name(func), json.dumps(args)
+    Job.objects.bulk_create([Job(
+        task=task, args=args, key=key, run_at=run_at,
+    )], ignore_conflicts=True)
+    if key is not None:
+        Job.objects.filter(key=key, status=Job.FAILED).update(
+            task=task, args=args, status=Job.QUEUED, attempts=0,
+            run_at=run_at, locked_at=None, error='',
+        )
+
+
+def purge():
+    """Удаляет выполненные задачи старше JOB_RETENTION_DAYS.
+
+    Возвращает число удалённых задач.
+    """
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE,
+        created__lt=timezone.now() - timedelta(
+            days=settings.JOB_RETENTION_DAYS
+        ),
+    ).delete()
+    return deleted
+
+
+def _call(func, args):
+    try:
+        with transaction.atomic():
+            func(*args)
+    except Exception:
+        logger.exception(
+            'Задача %s%s завершилась ошибкой', task_name(func), args
+        )
+
+
+def _ready():
+    """Задачи, которые пора выполнять, и задачи, зависшие
+    у упавшего воркера дольше JOB_TIMEOUT.
+    """
+    now = timezone.now()
+    return Q(status=Job.QUEUED, run_at__lte=now) | Q(
+        status=Job.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.JOB_TIMEOUT),
+    )
+
+
+def claim(limit):
+    """Забирает до limit готовых задач и возвращает их id.
+
+    Задача забирается условным UPDATE, поэтому одну задачу
+    не заберут два воркера, даже без SELECT ... FOR UPDATE.
+    """
+    candidates = list(
+        Job.objects.filter(_ready()).order_by('run_at', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+    claimed = []
+    for job_id in candidates:
+        if Job.objects.filter(_ready(), pk=job_id).update(
+            status=Job.RUNNING, locked_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        ):
+            claimed.append(job_id)
+    return claimed
+
+
+def run(job_id):
+    """Выполняет забранную задачу и записывает результат.
+
+    Возвращает True, если задача выполнена.
+    """
+    job = Job.objects.get(pk=job_id)
+    try:
+        import_string(job.task)(*json.loads(job.args))
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            logger.error('Задача %s не удалась: %s', job, error)
+            status, run_at = Job.FAILED, job.run_at
+        else:
+            delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            status = Job.QUEUED
+            run_at = timezone.now() + timedelta(seconds=delay)
+        Job.objects.filter(pk=job.pk).update(
+            status=status, run_at=run_at, locked_at=None, error=error
+        )
+        return False
+    if job.key is None:
+        Job.objects.filter(pk=job.pk).delete()
+    else:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.DONE, locked_at=None, error=''
+        )
+    return True
+
+
+def work(job_id):
+    """run() для потока или процесса пула: соединение с базой
+    закрывается после задачи.
+    """
+    try:
+        return run(job_id)
+    finally:
+        connection.close()
@@ -0,0 +1,66 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from core import jobs
+
+# как часто (в секундах) удалять старые выполненные задачи
+PURGE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Сколько задач выполнять одновременно.',
+        )
+        parser.add_argument(
+            '--processes', action='store_true',
+            help='Пул процессов вместо пула потоков.',
+        )
+        parser.add_argument(
+            '--poll', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, когда готовых задач не останется.',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        if options['processes']:
+            # spawn: дочерние процессы не наследуют открытые
+            # соединения с базой
+            executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=django.setup,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        else:
+            executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='jobs'
+            )
+        done = failed = 0
+        purge_at = time.monotonic()
+        with executor:
+            while True:
+                if time.monotonic() >= purge_at:
+                    jobs.purge()
+                    purge_at = time.monotonic() + PURGE_INTERVAL
+                claimed = jobs.claim(workers)
+                if not claimed:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll'])
+                    continue
+                for result in executor.map(jobs.work, claimed):
+                    done += result
+                    failed += not result
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {done}, с ошибкой: {failed}.'
+        ))
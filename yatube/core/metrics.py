@@ -0,0 +1,120 @@
+"""Метрики запросов: SQL, шаблоны, размер ответа.
+
+Замеры текущего запроса копятся в Timing, доступном через
+current(). Завершённые запросы попадают в скользящее окно
+последних METRICS_WINDOW замеров своего имени URL; snapshot()
+сводит окна в перцентили. Данные живут в памяти процесса.
+"""
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+FIELDS = ('duration_ms', 'sql_ms', 'queries', 'template_ms', 'bytes')
+
+_local = threading.local()
+_windows = {}
+_totals = {}
+_lock = threading.Lock()
+
+
+class Timing:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        """execute_wrapper: считает запросы и их время."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - started
+            self.queries += 1
+
+    @property
+    def duration(self):
+        return time.perf_counter() - self.started
+
+
+def start(timing=None):
+    """Начинает или продолжает замеры запроса в текущем потоке."""
+    _local.timing = timing or Timing()
+    return _local.timing
+
+
+def current():
+    """Замеры текущего запроса или None вне запроса."""
+    return getattr(_local, 'timing', None)
+
+
+def finish():
+    timing = current()
+    _local.timing = None
+    return timing
+
+
+def add_template_time(seconds):
+    timing = current()
+    if timing is not None:
+        timing.template += seconds
+
+
+def record(name, timing, duration, size):
+    """Добавляет завершённый запрос в окно имени URL."""
+    sample = (
+        duration * 1000, timing.sql * 1000, timing.queries,
+        timing.template * 1000, size,
+    )
+    window = _windows.get(name)
+    if window is None:
+        with _lock:
+            window = _windows.setdefault(
+                name, deque(maxlen=settings.METRICS_WINDOW)
+            )
+    window.append(sample)
+    with _lock:
+        _totals[name] = _totals.get(name, 0) + 1
+
+
+def _percentile(ordered, percent):
+    rank = max(1, round(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def snapshot():
+    """Сводка по именам URL: число запросов и перцентили полей
+    по последним METRICS_WINDOW запросам.
+    """
+    with _lock:
+        windows = {name: list(window) for name, window in _windows.items()}
+        totals = dict(_totals)
+    result = {}
+    for name, samples in sorted(windows.items()):
+        if not samples:
+            continue
+        summary = {'count': totals.get(name, 0), 'window': len(samples)}
+        for index, field in enumerate(FIELDS):
+            values = [sample[index] for sample in samples]
+            values = sorted(value for value in values if value is not None)
+            if not values:
+                continue
+            summary[field] = {
+                'p50': round(_percentile(values, 50), 3),
+                'p90': round(_percentile(values, 90), 3),
+                'p99': round(_percentile(values, 99), 3),
+                'max': round(values[-1], 3),
+            }
+        result[name] = summary
+    return result
+
+
+def reset():
+    with _lock:
+        _windows.clear()
+        _totals.clear()
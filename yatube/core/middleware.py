@@ -0,0 +1,167 @@
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from . import compression, metrics, queries, routers
+
+
+class TimingMiddleware:
+    """Замеряет запрос: число и время SQL-запросов, время
+    рендеринга шаблонов и размер ответа.
+
+    Результат отдаётся в заголовке Server-Timing и копится
+    в metrics по имени URL. Заодно запросы проверяются на N+1
+    и медленный SQL (см. queries). Тело потокового ответа
+    замеряется и проверяется так же, по частям; Server-Timing
+    уходит до тела и показывает работу до первого байта, а в
+    metrics запрос попадает после последней части. Должен стоять
+    первым в MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = metrics.Timing()
+        watch = queries.QueryWatch(request)
+        with self.watching(timing, watch):
+            response = self.get_response(request)
+        response['Server-Timing'] = (
+            f'db;dur={timing.sql * 1000:.1f};desc="{timing.queries} queries", '
+            f'tpl;dur={timing.template * 1000:.1f}, '
+            f'total;dur={timing.duration * 1000:.1f}'
+        )
+        if response.streaming:
+            response.streaming_content = self.stream(
+                request, response.streaming_content, timing, watch
+            )
+        else:
+            self.record(request, timing, watch, len(response.content))
+        return response
+
+    @staticmethod
+    @contextmanager
+    def watching(timing, watch):
+        metrics.start(timing)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timing.sql_wrapper)
+                    )
+                    stack.enter_context(connection.execute_wrapper(watch))
+                yield
+        finally:
+            metrics.finish()
+
+    def stream(self, request, content, timing, watch):
+        """Части тела; каждая готовится под теми же замерами."""
+        size = 0
+        content = iter(content)
+        try:
+            while True:
+                with self.watching(timing, watch):
+                    chunk = next(content, None)
+                if chunk is None:
+                    return
+                size += len(chunk)
+                yield chunk
+        finally:
+            self.record(request, timing, watch, size)
+
+    @staticmethod
+    def record(request, timing, watch, size):
+        watch.finish()
+        match = request.resolver_match
+        metrics.record(
+            match.view_name if match else 'unresolved', timing,
+            timing.duration, size,
+        )
+
+
+class CompressionMiddleware:
+    """Сжимает текстовые ответы brotli или gzip (см. compression).
+
+    Стоит сразу после TimingMiddleware: в метрики попадает размер
+    сжатого ответа, а в total - время сжатия. Сжатый ответ
+    длиннее исходного не отдаётся.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not compression.compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.negotiate(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+        if response.streaming:
+            response.streaming_content = compression.compress_sequence(
+                response.streaming_content, encoding
+            )
+            del response['Content-Length']
+        else:
+            content = compression.compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+
+class ReplicaMiddleware:
+    """Направляет чтение GET- и HEAD-запросов на реплики.
+
+    Если запрос что-то записал, ответ ставит cookie, и следующие
+    REPLICA_PIN_SECONDS секунд пользователь читает основную базу:
+    после редиректа из new_post или add_comment он видит свою запись.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (request.method in ('GET', 'HEAD')
+                and settings.REPLICA_PIN_COOKIE not in request.COOKIES):
+            routers.allow_replicas()
+        try:
+            response = self.get_response(request)
+            if routers.wrote():
+                response.set_cookie(
+                    settings.REPLICA_PIN_COOKIE, '1',
+                    max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                    samesite='Lax',
+                )
+            if response.streaming:
+                response.streaming_content = self.stream(
+                    routers.state(), response.streaming_content
+                )
+        finally:
+            routers.reset()
+        return response
+
+    @staticmethod
+    def stream(state, content):
+        """Части тела читают ту же базу, что и запрос до ответа."""
+        content = iter(content)
+        while True:
+            routers.restore(state)
+            try:
+                chunk = next(content, None)
+            finally:
+                state = routers.state()
+                routers.reset()
+            if chunk is None:
+                return
+            yield chunk
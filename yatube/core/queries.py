@@ -0,0 +1,111 @@
+"""Журнал медленных запросов и поиск N+1.
+
+QueryWatch подключается к соединениям на время запроса (см.
+TimingMiddleware) и группирует SQL по форме: параметры уже
+вынесены драйвером, списки IN (%s, %s, ...) сворачиваются.
+Если одна форма выполняется больше QUERY_REPEAT_LIMIT раз,
+QUERY_REPEAT_ACTION = 'raise' прерывает запрос исключением
+(так делает тестовый раннер), 'log' пишет предупреждение.
+Запросы дольше QUERY_SLOW_MS пишутся в журнал всегда.
+Для каждого указывается представление и строка шаблона.
+"""
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_SPACES = re.compile(r'\s+')
+_CORE_PATH = os.path.dirname(__file__)
+
+
+class RepeatedQueryError(Exception):
+    """Одна форма SQL выполнилась больше QUERY_REPEAT_LIMIT раз."""
+
+
+def normalize(sql):
+    return _SPACES.sub(' ', _IN_LIST.sub('(%s, ...)', sql)).strip()
+
+
+def origin():
+    """Место в шаблоне и в коде проекта, откуда пришёл запрос."""
+    template = code = None
+    frame = sys._getframe(1)
+    while frame and not (template and code):
+        node = frame.f_locals.get('self')
+        if template is None and frame.f_code.co_name == 'render_annotated':
+            token = getattr(node, 'token', None)
+            if token is not None and getattr(node, 'origin', None):
+                template = f'{node.origin.template_name}:{token.lineno}'
+        filename = frame.f_code.co_filename
+        if (code is None and filename.startswith(settings.BASE_DIR)
+                and os.path.dirname(filename) != _CORE_PATH
+                and 'site-packages' not in filename):
+            path = os.path.relpath(filename, settings.BASE_DIR)
+            code = f'{path}:{frame.f_lineno}'
+        frame = frame.f_back
+    return template, code
+
+
+class QueryWatch:
+    """execute_wrapper для одного запроса пользователя."""
+
+    def __init__(self, request):
+        self.request = request
+        self.shapes = Counter()
+        self.origins = {}
+
+    @property
+    def view(self):
+        match = self.request.resolver_match
+        return match.view_name if match else self.request.path
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            if settings.QUERY_SLOW_MS and duration >= settings.QUERY_SLOW_MS:
+                template, code = origin()
+                logger.warning(
+                    'Медленный запрос %.1f мс в %s (шаблон %s, код %s): %s',
+                    duration, self.view, template, code, sql,
+                )
+            if settings.QUERY_REPEAT_LIMIT:
+                self._count(sql)
+
+    def _count(self, sql):
+        shape = normalize(sql)
+        self.shapes[shape] += 1
+        count = self.shapes[shape]
+        if count == 1:
+            self.origins[shape] = None
+        elif count == settings.QUERY_REPEAT_LIMIT + 1:
+            self.origins[shape] = origin()
+            if settings.QUERY_REPEAT_ACTION == 'raise':
+                template, code = self.origins[shape]
+                raise RepeatedQueryError(
+                    f'Запрос выполнен больше {settings.QUERY_REPEAT_LIMIT} '
+                    f'раз в {self.view} (шаблон {template}, код {code}): '
+                    f'{shape}'
+                )
+
+    def finish(self):
+        """Пишет в журнал формы, превысившие QUERY_REPEAT_LIMIT."""
+        limit = settings.QUERY_REPEAT_LIMIT
+        if not limit:
+            return
+        for shape, count in self.shapes.items():
+            if count > limit:
+                template, code = self.origins[shape]
+                logger.warning(
+                    'N+1: запрос выполнен %d раз в %s (шаблон %s, код %s): '
+                    '%s', count, self.view, template, code, shape,
+                )
@@ -0,0 +1,244 @@
+"""Сервер с протоколом Redis (RESP) на чистом Python.
+
+Поддерживает подмножество команд, которым пользуется
+core.cache.RedisCache. Нужен для тестов и локального запуска
+нескольких воркеров с общим кэшем без установки Redis:
+
+    python -m core.resp --port 6379
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+
+class RespStore:
+    """Хранилище ключей с временем жизни, общее для всех соединений."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.databases = {}
+
+    def db(self, index):
+        return self.databases.setdefault(index, {})
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.db_index = 0
+
+    def handle(self):
+        while True:
+            try:
+                command = self.read_command()
+            except (ValueError, ConnectionError):
+                return
+            if command is None:
+                return
+            name = command[0].decode().upper()
+            method = getattr(self, f'cmd_{name.lower()}', None)
+            if method is None:
+                reply = self.error(f"ERR unknown command '{name}'")
+            else:
+                with self.server.store.lock:
+                    try:
+                        reply = method(*command[1:])
+                    except (TypeError, ValueError):
+                        reply = self.error(
+                            f"ERR wrong arguments for '{name}' command"
+                        )
+            try:
+                self.wfile.write(reply)
+            except OSError:
+                return
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if line[:1] != b'*':
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    # ответы
+
+    @staticmethod
+    def ok():
+        return b'+OK\r\n'
+
+    @staticmethod
+    def error(message):
+        return f'-{message}\r\n'.encode()
+
+    @staticmethod
+    def integer(value):
+        return b':%d\r\n' % value
+
+    @staticmethod
+    def bulk(value):
+        if value is None:
+            return b'$-1\r\n'
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+
+    def array(self, values):
+        return b'*%d\r\n' % len(values) + b''.join(
+            self.bulk(value) for value in values
+        )
+
+    # хранилище
+
+    @property
+    def data(self):
+        return self.server.store.db(self.db_index)
+
+    def lookup(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires <= time.monotonic():
+            del self.data[key]
+            return None
+        return item
+
+    # команды
+
+    def cmd_ping(self, *args):
+        return b'+PONG\r\n'
+
+    def cmd_auth(self, *args):
+        return self.ok()
+
+    def cmd_select(self, index):
+        self.db_index = int(index)
+        return self.ok()
+
+    def cmd_get(self, key):
+        item = self.lookup(key)
+        return self.bulk(item and item[0])
+
+    def cmd_mget(self, *keys):
+        items = [self.lookup(key) for key in keys]
+        return self.array([item and item[0] for item in items])
+
+    def cmd_set(self, key, value, *options):
+        options = [option.decode().upper() for option in options]
+        expires = None
+        if 'PX' in options:
+            ttl = int(options[options.index('PX') + 1]) / 1000
+            expires = time.monotonic() + ttl
+        elif 'EX' in options:
+            expires = time.monotonic() + int(options[options.index('EX') + 1])
+        exists = self.lookup(key) is not None
+        if ('NX' in options and exists) or ('XX' in options and not exists):
+            return self.bulk(None)
+        self.data[key] = (value, expires)
+        return self.ok()
+
+    def cmd_del(self, *keys):
+        deleted = 0
+        for key in keys:
+            if self.lookup(key) is not None:
+                del self.data[key]
+                deleted += 1
+        return self.integer(deleted)
+
+    def cmd_exists(self, *keys):
+        return self.integer(
+            sum(self.lookup(key) is not None for key in keys)
+        )
+
+    def cmd_incrby(self, key, delta):
+        item = self.lookup(key)
+        value, expires = item or (b'0', None)
+        try:
+            value = int(value) + int(delta)
+        except ValueError:
+            return self.error('ERR value is not an integer or out of range')
+        self.data[key] = (str(value).encode(), expires)
+        return self.integer(value)
+
+    def cmd_incr(self, key):
+        return self.cmd_incrby(key, b'1')
+
+    def cmd_pexpire(self, key, milliseconds):
+        item = self.lookup(key)
+        if item is None:
+            return self.integer(0)
+        expires = time.monotonic() + int(milliseconds) / 1000
+        self.data[key] = (item[0], expires)
+        return self.integer(1)
+
+    def cmd_expire(self, key, seconds):
+        return self.cmd_pexpire(key, int(seconds) * 1000)
+
+    def cmd_persist(self, key):
+        item = self.lookup(key)
+        if item is None or item[1] is None:
+            return self.integer(0)
+        self.data[key] = (item[0], None)
+        return self.integer(1)
+
+    def cmd_dbsize(self):
+        return self.integer(
+            sum(self.lookup(key) is not None for key in list(self.data))
+        )
+
+    def cmd_flushdb(self):
+        self.data.clear()
+        return self.ok()
+
+    def cmd_flushall(self):
+        self.server.store.databases.clear()
+        return self.ok()
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    """Сервер RESP. Порт 0 - выбрать свободный порт."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), RespHandler)
+        self.store = RespStore()
+        self._thread = None
+
+    @property
+    def location(self):
+        host, port = self.server_address[:2]
+        return f'{host}:{port}'
+
+    def start(self):
+        """Запускает сервер в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    args = parser.parse_args()
+    server = RespServer(args.host, args.port)
+    print(f'RESP-сервер слушает {server.location}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
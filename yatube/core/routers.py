@@ -0,0 +1,80 @@
+"""Чтение с реплик.
+
+Реплики перечислены в DATABASE_REPLICAS. Читать с них разрешает
+ReplicaMiddleware только на время GET- и HEAD-запросов: фоновые
+потоки, команды и запросы с записью работают с основной базой.
+После первой записи запрос до конца читает основную базу,
+а cookie REPLICA_PIN_COOKIE удерживает на ней и следующие запросы
+пользователя, пока реплики догоняют основную базу.
+
+Версии лент в кэше меняются сразу при записи, а реплика может
+отставать, поэтому то, что запрос прочитал с реплики, в кэши
+с версией не сохраняется (см. used_replica).
+"""
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_local = threading.local()
+
+
+def allow_replicas():
+    _local.replicas = True
+
+
+def pin():
+    """Дальше в этом запросе читать основную базу."""
+    _local.replicas = False
+
+
+def wrote():
+    """Была ли запись в текущем запросе."""
+    return getattr(_local, 'wrote', False)
+
+
+def used_replica():
+    """Читал ли текущий запрос реплику."""
+    return getattr(_local, 'used', False)
+
+
+def state():
+    """Состояние запроса, чтобы продолжить его в теле
+    потокового ответа (см. ReplicaMiddleware).
+    """
+    return (getattr(_local, 'replicas', False), wrote(), used_replica())
+
+
+def restore(saved):
+    _local.replicas, _local.wrote, _local.used = saved
+
+
+def reset():
+    _local.replicas = _local.wrote = _local.used = False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (not getattr(_local, 'replicas', False)
+                or not settings.DATABASE_REPLICAS
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        _local.used = True
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        _local.wrote = True
+        pin()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,32 @@
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    """WAL пускает чтение параллельно с записью, а busy_timeout
+    заставляет писателя ждать блокировку вместо ошибки.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    timeout = connection.settings_dict.get('BUSY_TIMEOUT', 5000)
+    connection.connection.executescript(
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        f'PRAGMA busy_timeout={int(timeout)};'
+    )
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    """Закрывает постоянные соединения, оборванные сервером,
+    чтобы запрос открыл новое, а не упал на первом SQL.
+    """
+    for connection in connections.all():
+        if (connection.connection is not None
+                and connection.settings_dict.get('CONN_HEALTH_CHECKS')
+                and not connection.in_atomic_block
+                and not connection.is_usable()):
+            connection.close()
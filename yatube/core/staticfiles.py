@@ -0,0 +1,196 @@
+"""Статика: имена с хэшем содержимого, сжатые копии и раздача.
+
+collectstatic через CompressedManifestStaticFilesStorage пишет
+файлы с хэшем в имени (bootstrap.min.3f2a….css) и рядом с текстовыми
+файлами кладёт сжатые копии .gz и, с пакетом brotli, .br.
+StaticFilesApp раздаёт STATIC_ROOT прямо из WSGI, если перед
+приложением нет CDN или nginx: выбирает сжатую копию по
+Accept-Encoding, отдаёт файл через wsgi.file_wrapper (sendfile
+у gunicorn), а файлам с хэшем в имени ставит
+Cache-Control: immutable.
+"""
+import gzip
+import mimetypes
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.contrib.staticfiles.apps import StaticFilesConfig
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.utils.http import parse_etags, quote_etag
+
+from . import compression
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = (
+    '.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.xml',
+    '.ico', '.eot', '.ttf', '.otf',
+)
+# сжатая копия сохраняется, если она меньше оригинала хотя бы на 5%
+MIN_RATIO = 0.95
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=60'
+BLOCK_SIZE = 64 * 1024
+
+
+class StaticFiles(StaticFilesConfig):
+    """Архив static.tar.gz в статике приложения не собирается."""
+    ignore_patterns = StaticFilesConfig.ignore_patterns + ['*.tar.gz']
+
+
+def compress(path):
+    """Пишет рядом с файлом его сжатые копии, если они выгодны.
+
+    Возвращает список записанных путей.
+    """
+    with open(path, 'rb') as source:
+        data = source.read()
+    compressors = [('.gz', lambda raw: gzip.compress(raw, 9, mtime=0))]
+    if brotli is not None:
+        compressors.append(('.br', brotli.compress))
+    written = []
+    for suffix, compressor in compressors:
+        packed = compressor(data)
+        if len(packed) < len(data) * MIN_RATIO:
+            with open(path + suffix, 'wb') as target:
+                target.write(packed)
+            written.append(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Имена с хэшем из манифеста и сжатые копии текстовых файлов.
+
+    Пока collectstatic не запускался (разработка, тесты),
+    {% static %} отдаёт исходные имена.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = []
+        for name, hashed_name, done in super().post_process(
+            paths, dry_run, **options
+        ):
+            processed.append((name, hashed_name))
+            yield name, hashed_name, done
+        if dry_run:
+            return
+        for name, hashed_name in processed:
+            for original in {name, hashed_name}:
+                if isinstance(original, str) and original.endswith(
+                    COMPRESSIBLE
+                ):
+                    compress(self.path(original))
+
+
+class StaticFilesApp:
+    """WSGI-обёртка, раздающая STATIC_ROOT под STATIC_URL.
+
+    Файлы перечисляются один раз при старте: после collectstatic
+    статика не меняется. Остальные запросы уходят в application.
+    ETag сжатой копии содержит её кодировку: у оригинала и копий
+    разные байты, и строгий ETag у них должен различаться.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = root or settings.STATIC_ROOT
+        self.prefix = prefix or settings.STATIC_URL
+        self.files = self.scan()
+
+    def scan(self):
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        hashed = set(storage.hashed_files.values())
+        files = {}
+        for directory, _, names in os.walk(self.root):
+            for filename in names:
+                if filename.endswith(('.gz', '.br')):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                files[self.prefix + name] = self.describe(
+                    path, name in hashed
+                )
+        return files
+
+    @staticmethod
+    def describe(path, immutable):
+        stat = os.stat(path)
+        content_type, _ = mimetypes.guess_type(path)
+        if content_type and content_type.startswith('text/'):
+            content_type += '; charset=utf-8'
+        variants = {
+            encoding: path + suffix for encoding, suffix in ENCODINGS
+            if os.path.exists(path + suffix)
+        }
+        return {
+            'path': path,
+            'variants': variants,
+            'headers': [
+                ('Content-Type', content_type or 'application/octet-stream'),
+                ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+                ('Cache-Control', IMMUTABLE if immutable else REVALIDATE),
+            ] + ([('Vary', 'Accept-Encoding')] if variants else []),
+            'mtime': int(stat.st_mtime),
+            'etag': f'{int(stat.st_mtime):x}-{stat.st_size:x}',
+        }
+
+    def __call__(self, environ, start_response):
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return self.application(environ, start_response)
+        found = self.files.get(unquote(environ.get('PATH_INFO', '')))
+        if found is None:
+            return self.application(environ, start_response)
+        path, etag = found['path'], found['etag']
+        # сжатые копии уже на диске, поэтому brotli при раздаче
+        # не нужен: выбор идёт только среди существующих копий
+        encoding = compression.negotiate(
+            environ.get('HTTP_ACCEPT_ENCODING', ''), found['variants']
+        )
+        if encoding:
+            path, etag = found['variants'][encoding], f'{etag}-{encoding}'
+        etag = quote_etag(etag)
+        headers = found['headers'] + [('ETag', etag)]
+        if self.not_modified(environ, found, etag):
+            start_response('304 Not Modified', headers)
+            return []
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(os.path.getsize(path))))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file = open(path, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(file, BLOCK_SIZE)
+        return iter(lambda: file.read(BLOCK_SIZE), b'')
+
+    @staticmethod
+    def not_modified(environ, found, etag):
+        if 'HTTP_IF_NONE_MATCH' in environ:
+            # If-None-Match сравнивается слабо: W/"x" совпадает с "x"
+            tags = {
+                tag[2:] if tag.startswith('W/') else tag
+                for tag in parse_etags(environ['HTTP_IF_NONE_MATCH'])
+            }
+            return '*' in tags or etag in tags
+        since = environ.get('HTTP_IF_MODIFIED_SINCE')
+        if since:
+            try:
+                return parsedate_to_datetime(since).timestamp() >= (
+                    found['mtime']
+                )
+            except (TypeError, ValueError):
+                return False
+        return False
@@ -0,0 +1,92 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+_local = threading.local()
+
+
+class TimedTemplate(Template):
+    """Шаблон, время рендеринга которого попадает в metrics.
+
+    Учитывается только внешний рендеринг: шаблон, отрендеренный
+    через API движка внутри другого (карточки постов), уже входит
+    в его время.
+    """
+
+    def render(self, context=None, request=None):
+        depth = getattr(_local, 'depth', 0)
+        _local.depth = depth + 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            _local.depth = depth
+            if not depth:
+                metrics.add_template_time(time.perf_counter() - started)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Шаблоны Django с учётом времени рендеринга в metrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+    def project_dirs(self):
+        """Каталоги шаблонов проекта, которые видят загрузчики."""
+        dirs = []
+        for loader in self.engine.template_loaders:
+            for inner in getattr(loader, 'loaders', [loader]):
+                dirs += [
+                    str(directory) for directory in inner.get_dirs()
+                    if str(directory).startswith(settings.BASE_DIR)
+                ]
+        return dirs
+
+    def warm_up(self):
+        """Компилирует все шаблоны проекта в кэш загрузчика.
+
+        Возвращает число загруженных шаблонов.
+        """
+        names = set()
+        for directory in self.project_dirs():
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    path = os.path.relpath(
+                        os.path.join(root, filename), directory
+                    )
+                    names.add(path.replace(os.sep, '/'))
+        loaded = 0
+        for name in sorted(names):
+            try:
+                self.engine.get_template(name)
+            except (TemplateSyntaxError, UnicodeDecodeError):
+                logger.exception('Шаблон %s не скомпилирован', name)
+            else:
+                loaded += 1
+        return loaded
+
+
+def warm_up():
+    """Заранее компилирует шаблоны всех движков TimedDjangoTemplates,
+    чтобы первые запросы воркера не разбирали их.
+    """
+    return sum(
+        engine.warm_up() for engine in engines.all()
+        if isinstance(engine, TimedDjangoTemplates)
+    )
@@ -0,0 +1,47 @@
+from django import template
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.templatetags.cache import CacheNode, do_cache
+
+from .. import routers
+
+register = template.Library()
+
+
+class FragmentCacheNode(CacheNode):
+    """{% cache %}, который не сохраняет фрагмент, если запрос
+    читал реплику (см. core.routers).
+    """
+
+    def render(self, context):
+        fragment_cache = self.fragment_cache(context)
+        key = make_template_fragment_key(
+            self.fragment_name, [var.resolve(context) for var in self.vary_on]
+        )
+        value = fragment_cache.get(key)
+        if value is None:
+            value = self.nodelist.render(context)
+            if not routers.used_replica():
+                timeout = self.expire_time_var.resolve(context)
+                fragment_cache.set(
+                    key, value, None if timeout is None else int(timeout)
+                )
+        return value
+
+    def fragment_cache(self, context):
+        if self.cache_name:
+            return caches[self.cache_name.resolve(context)]
+        try:
+            return caches['template_fragments']
+        except InvalidCacheBackendError:
+            return caches['default']
+
+
+@register.tag('cache')
+def do_fragment_cache(parser, token):
+    """Тот же синтаксис, что у {% cache %} из django.templatetags."""
+    node = do_cache(parser, token)
+    return FragmentCacheNode(
+        node.nodelist, node.expire_time_var, node.fragment_name,
+        node.vary_on, node.cache_name,
+    )
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+REPEAT_LIMIT = 5
+
+
+class TestRunner(DiscoverRunner):
+    """Тесты падают, если за один запрос к сайту одна форма
+    SQL выполняется больше REPEAT_LIMIT раз (N+1). Фоновые задачи
+    выполняются сразу: воркеров в тестах нет.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.query_settings = override_settings(
+            QUERY_REPEAT_LIMIT=settings.QUERY_REPEAT_LIMIT or REPEAT_LIMIT,
+            QUERY_REPEAT_ACTION='raise',
+            JOBS_EAGER=True,
+        )
+        self.query_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.query_settings.disable()
+        super().teardown_test_environment(**kwargs)
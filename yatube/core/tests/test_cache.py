@@ -0,0 +1,113 @@
+import time
+
+from django.test import SimpleTestCase
+
+from ..cache import RedisCache
+from ..config import cache_from_url
+from ..resp import RespServer
+
+
+class CacheConfigTest(SimpleTestCase):
+    def test_cache_from_url(self):
+        """URL кэша превращается в настройку CACHES."""
+        configs = {
+            'locmem://': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'file:///var/tmp/yatube?timeout=60': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': '/var/tmp/yatube',
+                'TIMEOUT': 60,
+            },
+            'memcached://10.0.0.1:11211,10.0.0.2:11211': {
+                'BACKEND':
+                    'django.core.cache.backends.memcached.MemcachedCache',
+                'LOCATION': ['10.0.0.1:11211', '10.0.0.2:11211'],
+            },
+            'redis://:secret@cache:6380/2?key_prefix=yatube': {
+                'BACKEND': 'core.cache.RedisCache',
+                'LOCATION': 'cache:6380',
+                'OPTIONS': {'DB': 2, 'PASSWORD': 'secret'},
+                'KEY_PREFIX': 'yatube',
+            },
+        }
+        for url, expected in configs.items():
+            with self.subTest(url=url):
+                self.assertEqual(cache_from_url(url), expected)
+        with self.assertRaises(ValueError):
+            cache_from_url('mongo://localhost')
+
+
+class RedisCacheTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Сервер RESP в фоновом потоке."""
+        super().setUpClass()
+        cls.server = RespServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Два клиента, как у двух воркеров."""
+        self.cache = RedisCache(self.server.location, {})
+        self.other_worker = RedisCache(self.server.location, {})
+        self.cache.clear()
+
+    def test_basic_operations(self):
+        """Бэкенд выполняет основные операции кэша."""
+        self.cache.set('post', {'id': 1, 'text': 'Текст'})
+        self.assertEqual(self.cache.get('post'), {'id': 1, 'text': 'Текст'})
+        self.assertIsNone(self.cache.get('missing'))
+        self.assertFalse(self.cache.add('post', 'другое'))
+        self.assertTrue(self.cache.add('new', 'значение'))
+        self.assertTrue(self.cache.has_key('new'))
+        self.cache.delete('new')
+        self.assertFalse(self.cache.has_key('new'))
+
+    def test_incr(self):
+        """Целые числа увеличиваются на сервере."""
+        self.cache.set('counter', 1)
+        self.assertEqual(self.cache.incr('counter', 5), 6)
+        self.assertEqual(self.cache.get('counter'), 6)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_many(self):
+        """get_many, set_many и delete_many работают пакетом."""
+        self.cache.set_many({'a': 1, 'b': [2], 'c': 'три'})
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c', 'd']),
+            {'a': 1, 'b': [2], 'c': 'три'}
+        )
+        self.cache.delete_many(['a', 'b'])
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'c': 'три'})
+
+    def test_timeout(self):
+        """Значения истекают по таймауту."""
+        self.cache.set('short', 'значение', timeout=0.05)
+        self.cache.set('forever', 'значение', timeout=None)
+        self.assertEqual(self.cache.get('short'), 'значение')
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('short'))
+        self.assertEqual(self.cache.get('forever'), 'значение')
+        self.assertTrue(self.cache.touch('forever', timeout=0.05))
+        self.assertFalse(self.cache.touch('short'))
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('forever'))
+
+    def test_workers_share_invalidation(self):
+        """Запись и удаление видны всем воркерам."""
+        self.cache.set('fragment', '<div>')
+        self.assertEqual(self.other_worker.get('fragment'), '<div>')
+        self.other_worker.delete('fragment')
+        self.assertIsNone(self.cache.get('fragment'))
+
+    def test_reconnects(self):
+        """После обрыва соединения клиент переподключается."""
+        self.cache.set('key', 'значение')
+        self.cache._local.connection.sock.close()
+        self.assertEqual(self.cache.get('key'), 'значение')
@@ -0,0 +1,78 @@
+import gzip
+import zlib
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from .. import compression
+from ..middleware import CompressionMiddleware
+
+PAGE = '<p>Пост</p>\n' * 100
+
+
+class CompressionMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def compress(self, response, accept='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_page_is_gzipped(self):
+        plain = self.client.get(reverse('index'))
+        response = self.client.get(
+            reverse('index'), HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Cookie, Accept-Encoding')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertNotIn('Content-Encoding', plain)
+
+    def test_skipped_responses(self):
+        """Короткие, не текстовые и уже сжатые ответы не сжимаются."""
+        encoded = HttpResponse(PAGE)
+        encoded['Content-Encoding'] = 'br'
+        for response in (
+            HttpResponse('<p>Пост</p>'),
+            HttpResponse(b'\xff' * 1000, content_type='image/jpeg'),
+            encoded,
+        ):
+            with self.subTest(response=response):
+                content = response.content
+                self.assertEqual(self.compress(response).content, content)
+        self.assertEqual(
+            self.compress(HttpResponse(PAGE), accept='gzip;q=0').content,
+            PAGE.encode(),
+        )
+
+    def test_streaming_response(self):
+        """Поток сжимается по частям, каждая часть уже декодируема."""
+        response = self.compress(
+            StreamingHttpResponse(iter([PAGE, PAGE]))
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        chunks = list(response.streaming_content)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.assertEqual(
+            decompressor.decompress(chunks[0]).decode(), PAGE
+        )
+        self.assertEqual(
+            gzip.decompress(b''.join(chunks)).decode(), PAGE * 2
+        )
+
+    def test_negotiate(self):
+        with mock.patch.object(compression, 'brotli', object()):
+            self.assertEqual(compression.negotiate('gzip, br'), 'br')
+            self.assertEqual(compression.negotiate('br;q=0, gzip'), 'gzip')
+            self.assertEqual(compression.negotiate('*'), 'br')
+        with mock.patch.object(compression, 'brotli', None):
+            self.assertEqual(compression.negotiate('gzip, br'), 'gzip')
+            self.assertIsNone(compression.negotiate('br'))
+        self.assertIsNone(compression.negotiate('identity'))
+        self.assertIsNone(compression.negotiate(''))
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from ..config import database_from_url
+from ..signals import check_connections
+
+
+class DatabaseConfigTest(SimpleTestCase):
+    def test_database_from_url(self):
+        """URL базы превращается в настройку DATABASES."""
+        configs = {
+            'sqlite:///db.sqlite3': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': '/srv/yatube/db.sqlite3',
+                'BUSY_TIMEOUT': 5000,
+            },
+            'sqlite:////var/lib/yatube.sqlite3?busy_timeout=100': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': '/var/lib/yatube.sqlite3',
+                'BUSY_TIMEOUT': 100,
+            },
+            'postgres://anna:p%40ss@db:6432/yatube?conn_max_age=600'
+            '&health_checks=true&pool=pgbouncer&sslmode=require': {
+                'ENGINE': 'django.db.backends.postgresql',
+                'NAME': 'yatube',
+                'USER': 'anna',
+                'PASSWORD': 'p@ss',
+                'HOST': 'db',
+                'PORT': '6432',
+                'CONN_MAX_AGE': 600,
+                'CONN_HEALTH_CHECKS': True,
+                'DISABLE_SERVER_SIDE_CURSORS': True,
+                'OPTIONS': {'sslmode': 'require'},
+            },
+        }
+        for url, expected in configs.items():
+            with self.subTest(url=url):
+                self.assertEqual(
+                    database_from_url(url, '/srv/yatube'), expected
+                )
+        with self.assertRaises(ValueError):
+            database_from_url('mysql://localhost/yatube', '/srv/yatube')
+
+
+class ConnectionHooksTest(TestCase):
+    def test_sqlite_pragmas(self):
+        """Соединение с SQLite настраивается при открытии."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone(), (1,))
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone(), (5000,))
+
+    def test_health_check(self):
+        """Оборванное постоянное соединение закрывается в начале
+        запроса, а не внутри транзакции.
+        """
+        settings_dict = dict(connection.settings_dict,
+                             CONN_HEALTH_CHECKS=True)
+        with mock.patch.object(connection, 'settings_dict', settings_dict), \
+                mock.patch.object(connection, 'is_usable',
+                                  return_value=False), \
+                mock.patch.object(connection, 'close') as close:
+            check_connections()
+            close.assert_not_called()
+            with mock.patch.object(connection, 'in_atomic_block', False):
+                check_connections()
+            close.assert_called_once_with()
@@ -0,0 +1,143 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from posts.models import FeedEntry, Follow, Post, User
+
+from .. import jobs
+from ..models import Job
+
+calls = []
+
+
+def record(value):
+    calls.append(value)
+
+
+def fail():
+    raise ValueError('Ошибка задачи')
+
+
+@override_settings(JOBS_EAGER=False, JOB_MAX_ATTEMPTS=3, JOB_RETRY_DELAY=10)
+class JobQueueTest(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_defer_after_commit_once_per_key(self):
+        """Задача попадает в очередь после коммита, повтор
+        с тем же ключом игнорируется.
+        """
+        with transaction.atomic():
+            jobs.defer(record, 1, key='record:1')
+            self.assertFalse(Job.objects.exists())
+        jobs.defer(record, 1, key='record:1')
+        with transaction.atomic():
+            jobs.defer(record, 2)
+            transaction.set_rollback(True)
+        self.assertEqual(
+            list(Job.objects.values_list('task', 'args', 'key')),
+            [('core.tests.test_jobs.record', '[1]', 'record:1')],
+        )
+
+    def test_run_and_idempotency(self):
+        """Выполненная задача с ключом остаётся в таблице,
+        без ключа - удаляется.
+        """
+        jobs.enqueue(record, 'ключ', key='record')
+        jobs.enqueue(record, 'без ключа')
+        self.assertEqual(len(jobs.claim(10)), 2)
+        self.assertEqual(jobs.claim(10), [])
+        for job in Job.objects.all():
+            self.assertTrue(jobs.run(job.pk))
+        self.assertCountEqual(calls, ['ключ', 'без ключа'])
+        job = Job.objects.get()
+        self.assertEqual((job.key, job.status), ('record', Job.DONE))
+        jobs.enqueue(record, 'ключ', key='record')
+        self.assertEqual(jobs.claim(10), [])
+
+    def test_retries_with_backoff(self):
+        """Упавшая задача повторяется с удвоенной паузой,
+        после JOB_MAX_ATTEMPTS попыток - не удалась.
+        """
+        jobs.enqueue(fail)
+        for attempt, delay in enumerate((10, 20), 1):
+            started = timezone.now()
+            [job_id] = jobs.claim(1)
+            self.assertFalse(jobs.run(job_id))
+            job = Job.objects.get(pk=job_id)
+            self.assertEqual(
+                (job.status, job.attempts), (Job.QUEUED, attempt)
+            )
+            self.assertIn('Ошибка задачи', job.error)
+            self.assertGreaterEqual(
+                job.run_at, started + timedelta(seconds=delay)
+            )
+            self.assertEqual(jobs.claim(1), [])
+            Job.objects.update(run_at=timezone.now())
+        [job_id] = jobs.claim(1)
+        self.assertFalse(jobs.run(job_id))
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+
+    def test_failed_keyed_job_requeued(self):
+        """Неудавшаяся задача с ключом при повторной постановке
+        снова выполняется, с новыми попытками.
+        """
+        jobs.enqueue(fail, key='job')
+        Job.objects.update(status=Job.FAILED, attempts=3, error='Ошибка')
+        jobs.enqueue(record, 'снова', key='job')
+        job = Job.objects.get()
+        self.assertEqual(
+            (job.status, job.attempts, job.error), (Job.QUEUED, 0, '')
+        )
+        [job_id] = jobs.claim(1)
+        self.assertTrue(jobs.run(job_id))
+        self.assertEqual(calls, ['снова'])
+
+    @override_settings(JOB_RETENTION_DAYS=7)
+    def test_purge_old_done_jobs(self):
+        """purge() удаляет только выполненные задачи старше
+        JOB_RETENTION_DAYS; run_workers вызывает её.
+        """
+        for key, status in (
+            ('old', Job.DONE), ('failed', Job.FAILED), ('queued', Job.QUEUED),
+        ):
+            jobs.enqueue(record, key, key=key, delay=3600)
+            Job.objects.filter(key=key).update(status=status)
+        jobs.enqueue(record, 'new', key='new')
+        Job.objects.filter(key='new').update(status=Job.DONE)
+        Job.objects.exclude(key='new').update(
+            created=timezone.now() - timedelta(days=8)
+        )
+        call_command('run_workers', '--once', stdout=StringIO())
+        self.assertCountEqual(
+            Job.objects.values_list('key', flat=True),
+            ['failed', 'queued', 'new'],
+        )
+
+    @override_settings(JOB_TIMEOUT=60)
+    def test_stale_jobs_reclaimed(self):
+        """Задачу упавшего воркера забирают снова после JOB_TIMEOUT."""
+        jobs.enqueue(record, 1)
+        [job_id] = jobs.claim(1)
+        self.assertEqual(jobs.claim(1), [])
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(jobs.claim(1), [job_id])
+
+    def test_run_workers_fans_out_posts(self):
+        """run_workers раскладывает новый пост по лентам."""
+        author = User.objects.create_user(username='anna')
+        reader = User.objects.create_user(username='Galina')
+        Follow.objects.create(user=reader, author=author)
+        post = Post.objects.create(text='Текст поста.', author=author)
+        self.assertFalse(FeedEntry.objects.exists())
+        out = StringIO()
+        call_command('run_workers', '--once', '--workers=1', stdout=out)
+        self.assertIn('Выполнено задач: 1', out.getvalue())
+        self.assertEqual(
+            list(FeedEntry.objects.values_list('user_id', 'post_id')),
+            [(reader.id, post.id)],
+        )
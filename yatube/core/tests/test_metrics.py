@@ -0,0 +1,57 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import metrics
+
+User = get_user_model()
+
+
+class TimingMiddlewareTest(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.guest_client = Client()
+
+    def test_server_timing(self):
+        """Заголовок Server-Timing содержит число запросов и время
+        SQL, шаблонов и всего запроса.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(reverse('index'))
+        timing = response['Server-Timing']
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        durations = dict(re.findall(r'(\w+);dur=([\d.]+)', timing))
+        self.assertEqual(set(durations), {'db', 'tpl', 'total'})
+        self.assertGreater(float(durations['tpl']), 0)
+        self.assertLessEqual(
+            float(durations['db']), float(durations['total'])
+        )
+
+    def test_snapshot_by_url_name(self):
+        """Запросы копятся по имени URL."""
+        for _ in range(3):
+            self.guest_client.get(reverse('index'))
+        self.guest_client.get(reverse('about:author'))
+        summary = metrics.snapshot()
+        self.assertEqual(summary['index']['count'], 3)
+        self.assertEqual(summary['about:author']['count'], 1)
+        self.assertEqual(
+            set(summary['index']),
+            {'count', 'window'} | set(metrics.FIELDS),
+        )
+        self.assertGreater(summary['index']['bytes']['p50'], 0)
+
+    def test_metrics_view_for_staff_only(self):
+        """Сводка доступна только сотрудникам."""
+        response = self.guest_client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 302)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.guest_client.force_login(staff)
+        self.guest_client.get(reverse('index'))
+        response = self.guest_client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('index', response.json())
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from ..middleware import TimingMiddleware
+from ..queries import RepeatedQueryError, normalize
+
+User = get_user_model()
+
+
+def repeated_view(request):
+    for user_id in range(7):
+        User.objects.filter(pk=user_id).exists()
+    return HttpResponse()
+
+
+class QueryWatchTest(TestCase):
+    def setUp(self):
+        self.middleware = TimingMiddleware(repeated_view)
+        self.request = RequestFactory().get('/repeated/')
+
+    def test_normalize(self):
+        """Списки IN и пробелы сворачиваются."""
+        self.assertEqual(
+            normalize('SELECT * FROM t\n WHERE id IN (%s, %s,%s)'),
+            normalize('SELECT * FROM t WHERE id IN (%s, %s)'),
+        )
+
+    @override_settings(QUERY_REPEAT_LIMIT=5, QUERY_REPEAT_ACTION='raise')
+    def test_repeated_queries_raise(self):
+        with self.assertRaisesMessage(RepeatedQueryError, 'больше 5 раз'):
+            self.middleware(self.request)
+
+    @override_settings(QUERY_REPEAT_LIMIT=5, QUERY_REPEAT_ACTION='log')
+    def test_repeated_queries_logged(self):
+        with self.assertLogs('core.queries', 'WARNING') as logs:
+            self.middleware(self.request)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('выполнен 7 раз в /repeated/', logs.output[0])
+        self.assertIn('core/tests/test_queries.py', logs.output[0])
+
+    @override_settings(QUERY_REPEAT_LIMIT=10, QUERY_SLOW_MS=1e-9)
+    def test_slow_queries_logged(self):
+        with self.assertLogs('core.queries', 'WARNING') as logs:
+            self.middleware(self.request)
+        self.assertEqual(len(logs.output), 7)
+        self.assertIn('Медленный запрос', logs.output[0])
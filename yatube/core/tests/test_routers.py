@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from ..routers import ReplicaRouter
+
+REPLICA = 'replica'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRouterTest(TransactionTestCase):
+    """Основная база и реплика - два отдельных файла SQLite.
+    Реплика получает копию основной базы только в replicate(),
+    поэтому отставание реплики видно в ответах.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        connections.databases[REPLICA] = dict(
+            settings.DATABASES['default'],
+            NAME=os.path.join(cls.directory, 'replica.sqlite3'),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        delattr(connections._connections, REPLICA)
+        del connections.databases[REPLICA]
+        shutil.rmtree(cls.directory)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='anna')
+        Post.objects.create(text='Старый пост', author=self.author)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.replicate()
+
+    def replicate(self):
+        connections['default'].ensure_connection()
+        connections[REPLICA].ensure_connection()
+        connections['default'].connection.backup(
+            connections[REPLICA].connection
+        )
+
+    def assertPosts(self, response, texts):
+        """Страница показывает ровно эти посты из двух."""
+        for text in ('Новый пост', 'Старый пост'):
+            if text in texts:
+                self.assertContains(response, text)
+            else:
+                self.assertNotContains(response, text)
+
+    def test_anonymous_reads_replica(self):
+        """Аноним читает реплику и не видит ещё не доехавший пост,
+        но страница с реплики в кэш под новой версией не попадает.
+        """
+        Post.objects.create(text='Новый пост', author=self.author)
+        response = Client().get(reverse('index'))
+        self.assertPosts(response, ['Старый пост'])
+        self.replicate()
+        response = Client().get(reverse('index'))
+        self.assertPosts(response, ['Новый пост', 'Старый пост'])
+
+    def test_author_reads_own_writes(self):
+        """После публикации автор читает основную базу."""
+        response = self.author_client.post(
+            reverse('new_post'), {'text': 'Новый пост'}, follow=True
+        )
+        self.assertIn(settings.REPLICA_PIN_COOKIE, self.author_client.cookies)
+        self.assertPosts(response, ['Новый пост', 'Старый пост'])
+        self.author_client.cookies.pop(settings.REPLICA_PIN_COOKIE)
+        cache.clear()
+        response = self.author_client.get(reverse('index'))
+        self.assertPosts(response, ['Старый пост'])
+        self.replicate()
+        response = self.author_client.get(reverse('index'))
+        self.assertPosts(response, ['Новый пост', 'Старый пост'])
+
+    @override_settings(STREAM_FEEDS=True)
+    def test_streamed_page_reads_replica(self):
+        """Тело потокового ответа читает реплику, как и обычный
+        ответ, и не кэшируется.
+        """
+        Post.objects.create(text='Новый пост', author=self.author)
+        for texts in (['Старый пост'], ['Новый пост', 'Старый пост']):
+            response = self.author_client.get(reverse('index'))
+            self.assertTrue(response.streaming)
+            content = b''.join(response.streaming_content).decode()
+            for text in ('Новый пост', 'Старый пост'):
+                self.assertEqual(text in content, text in texts)
+            self.replicate()
+
+    def test_migrations_skip_replicas(self):
+        """Миграции применяются только к основной базе."""
+        router = ReplicaRouter()
+        self.assertFalse(router.allow_migrate(REPLICA, 'posts'))
+        self.assertIsNone(router.allow_migrate('default', 'posts'))
@@ -0,0 +1,140 @@
+import gzip
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from ..staticfiles import (IMMUTABLE, REVALIDATE,
+                           CompressedManifestStaticFilesStorage,
+                           StaticFilesApp)
+
+CSS = b'.card { background: url("bg.png"); }\n' * 50
+
+
+class StaticFilesTest(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = CompressedManifestStaticFilesStorage(
+            location=self.root
+        )
+        for name, content in (('css/site.css', CSS), ('css/bg.png', b'png')):
+            self.storage.save(name, ContentFile(content))
+        paths = {name: (self.storage, name)
+                 for name in ('css/site.css', 'css/bg.png')}
+        list(self.storage.post_process(paths))
+        self.storage.save_manifest()
+        self.hashed = self.storage.stored_name('css/site.css')
+        self.app = StaticFilesApp(
+            self.fallback, root=self.root, prefix='/static/'
+        )
+
+    @staticmethod
+    def fallback(environ, start_response):
+        start_response('200 OK', [])
+        return [b'app']
+
+    def get(self, path, **headers):
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, **headers}
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        body = b''.join(self.app(environ, start_response))
+        return response['status'], response['headers'], body
+
+    def test_collect_writes_hashed_and_compressed_files(self):
+        """Имя с хэшем, ссылки внутри CSS на имена с хэшем,
+        сжатая копия рядом.
+        """
+        self.assertRegex(self.hashed, r'^css/site\.[0-9a-f]{12}\.css$')
+        with self.storage.open(self.hashed) as file:
+            content = file.read()
+        background = self.storage.stored_name('css/bg.png')
+        self.assertIn(background.split('/')[-1].encode(), content)
+        with self.storage.open(self.hashed + '.gz') as file:
+            self.assertEqual(gzip.decompress(file.read()), content)
+        self.assertFalse(self.storage.exists('css/bg.png.gz'))
+
+    def test_hashed_file_is_immutable_and_compressed(self):
+        status, headers, body = self.get(
+            '/static/' + self.hashed, HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Cache-Control'], IMMUTABLE)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(headers['Content-Length'], str(len(body)))
+        self.assertTrue(headers['Content-Type'].startswith('text/css'))
+        self.assertIn(b'.card', gzip.decompress(body))
+
+    def test_plain_name_revalidates_without_compression(self):
+        status, headers, body = self.get('/static/css/site.css')
+        self.assertEqual(headers['Cache-Control'], REVALIDATE)
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertIn(b'.card', body)
+
+    def test_encoding_negotiated(self):
+        """Сжатая копия отдаётся только клиенту, принимающему её
+        кодировку с q > 0.
+        """
+        path = '/static/' + self.hashed
+        for accept, encoding in (
+            ('gzip;q=0', None),
+            ('x-gzip-unsupported', None),
+            ('identity', None),
+            ('identity, gzip;q=0.5', 'gzip'),
+            ('*', 'gzip'),
+        ):
+            with self.subTest(accept=accept):
+                _, headers, body = self.get(
+                    path, HTTP_ACCEPT_ENCODING=accept
+                )
+                self.assertEqual(headers.get('Content-Encoding'), encoding)
+                if encoding is None:
+                    self.assertIn(b'.card', body)
+
+    def test_not_modified(self):
+        _, headers, _ = self.get('/static/' + self.hashed)
+        status, _, body = self.get(
+            '/static/' + self.hashed, HTTP_IF_NONE_MATCH=headers['ETag']
+        )
+        self.assertEqual(status, '304 Not Modified')
+        self.assertEqual(body, b'')
+
+    def test_etag_depends_on_encoding(self):
+        """Оригинал и сжатая копия - разные ETag; If-None-Match
+        сравнивается по списку тегов, а не как подстрока.
+        """
+        path = '/static/' + self.hashed
+        _, plain, _ = self.get(path)
+        _, packed, _ = self.get(path, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotEqual(plain['ETag'], packed['ETag'])
+        for if_none_match, status in (
+            (packed['ETag'], '200 OK'),
+            (f'"x", {plain["ETag"]}', '304 Not Modified'),
+            (plain['ETag'][:-1] + '0"', '200 OK'),
+            ('W/' + plain['ETag'], '304 Not Modified'),
+            ('*', '304 Not Modified'),
+        ):
+            with self.subTest(if_none_match=if_none_match):
+                self.assertEqual(
+                    self.get(path, HTTP_IF_NONE_MATCH=if_none_match)[0],
+                    status,
+                )
+
+    def test_other_paths_go_to_application(self):
+        for path in ('/static/missing.css', '/posts/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path)[2], b'app')
+
+    def test_stored_name_without_manifest(self):
+        """Без collectstatic {% static %} отдаёт исходное имя."""
+        storage = CompressedManifestStaticFilesStorage(
+            location=tempfile.mkdtemp()
+        )
+        self.addCleanup(shutil.rmtree, storage.location)
+        self.assertEqual(storage.url('css/site.css'), '/static/css/site.css')
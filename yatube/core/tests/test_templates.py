@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.template import engines
+from django.test import SimpleTestCase
+
+from .. import metrics
+from ..template_backends import warm_up
+
+
+class TemplateWarmUpTest(SimpleTestCase):
+    def test_warm_up_fills_cached_loader(self):
+        """warm_up() компилирует шаблоны проекта заранее,
+        шаблоны админки не трогает.
+        """
+        engine = engines.all()[0].engine
+        loader = engine.template_loaders[0]
+        loader.reset()
+        self.assertGreater(warm_up(), 10)
+        cached = set(loader.get_template_cache)
+        self.assertTrue({
+            'index.html', 'profile.html', 'includes/post_item.html',
+            'includes/paginator.html',
+        } <= cached)
+        self.assertNotIn('admin/base.html', cached)
+        template = engine.get_template('index.html')
+        self.assertIs(engine.get_template('index.html'), template)
+
+
+class TimedTemplateTest(SimpleTestCase):
+    def test_nested_render_counted_once(self):
+        """Шаблон, отрендеренный внутри другого, не добавляет
+        своё время второй раз.
+        """
+        engine = engines.all()[0]
+        inner = engine.from_string('внутри')
+        outer = engine.from_string('{{ render }}')
+        timing = metrics.start()
+        self.addCleanup(metrics.finish)
+        with mock.patch.object(
+            metrics, 'add_template_time', wraps=metrics.add_template_time
+        ) as added:
+            self.assertEqual(
+                outer.render({'render': lambda: inner.render()}), 'внутри'
+            )
+            inner.render()
+        self.assertEqual(added.call_count, 2)
+        self.assertGreater(timing.template, 0)
@@ -0,0 +1,37 @@
+from django import forms
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .. import uploads
+
+
+class ImageForm(forms.Form):
+    """Форма с ImageField, ничего не знающая о лимите (как админка)."""
+    text = forms.CharField()
+    image = forms.ImageField(required=False)
+
+
+@override_settings(UPLOAD_MAX_BYTES=100)
+class LimitedUploadHandlerTest(SimpleTestCase):
+    def post(self, size):
+        return RequestFactory().post('/', {
+            'text': 'Текст',
+            'image': SimpleUploadedFile('big.jpg', b'x' * size),
+        })
+
+    def test_oversized_upload_stops_parsing(self):
+        """Файл больше лимита не попадает в FILES, запрос
+        помечается, форма с ImageField не падает.
+        """
+        request = self.post(1000)
+        self.assertEqual(request.POST['text'], 'Текст')
+        self.assertNotIn('image', request.FILES)
+        self.assertTrue(uploads.too_large(request))
+        form = ImageForm(request.POST, request.FILES)
+        self.assertTrue(form.is_valid())
+        self.assertIsNone(form.cleaned_data['image'])
+
+    def test_small_upload_kept(self):
+        request = self.post(50)
+        self.assertEqual(request.FILES['image'].read(), b'x' * 50)
+        self.assertFalse(uploads.too_large(request))
@@ -0,0 +1,108 @@
+"""Загрузка изображений: потоковая запись с лимитом и нормализация.
+
+LimitedUploadHandler пишет каждый файл во временный файл на диске,
+а после UPLOAD_MAX_BYTES прекращает разбор тела запроса (StopUpload):
+остаток тела не читается, файл в request.FILES не попадает, а
+too_large(request) сообщает форме, что лимит превышен. Любая другая
+форма с ImageField (админка) просто не получает файл. process_image
+проверяет размер в пикселях по заголовку, уменьшает картинку до
+UPLOAD_IMAGE_MAX_SIDE и перекодирует её без EXIF.
+"""
+import os
+import tempfile
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import (StopUpload,
+                                             TemporaryFileUploadHandler)
+from django.utils.translation import gettext_lazy as _
+from PIL import Image, ImageOps
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """Потоковая запись загрузок во временные файлы с лимитом размера."""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_BYTES:
+            self.file.close()
+            self.request.upload_too_large = True
+            raise StopUpload(connection_reset=True)
+        return super().receive_data_chunk(raw_data, start)
+
+
+def too_large(request):
+    """Прервана ли загрузка запроса из-за UPLOAD_MAX_BYTES."""
+    return getattr(request, 'upload_too_large', False)
+
+
+def size_error():
+    return ValidationError(
+        _('Файл больше %(limit)d МБ.'),
+        code='file_too_large',
+        params={'limit': settings.UPLOAD_MAX_BYTES // 2 ** 20},
+    )
+
+
+def check_size(upload):
+    if upload.size > settings.UPLOAD_MAX_BYTES:
+        raise size_error()
+
+
+def process_image(upload):
+    """Возвращает уменьшенную и перекодированную копию картинки.
+
+    Картинки с прозрачностью сохраняются в PNG, остальные в
+    прогрессивный JPEG. Метаданные не переносятся, ориентация
+    из EXIF применяется к пикселям.
+    """
+    check_size(upload)
+    upload.seek(0)
+    output = tempfile.TemporaryFile()
+    try:
+        return _reencode(upload, output)
+    except (OSError, Image.DecompressionBombError):
+        # заголовок прошёл проверку ImageField, а пиксели
+        # не декодируются (например, обрезанный JPEG)
+        output.close()
+        raise ValidationError(
+            forms.ImageField.default_error_messages['invalid_image'],
+            code='invalid_image',
+        )
+
+
+def _reencode(upload, output):
+    with Image.open(upload) as source:
+        width, height = source.size
+        if width * height > settings.UPLOAD_MAX_PIXELS:
+            raise ValidationError(
+                _('Изображение больше %(limit)d мегапикселей.'),
+                code='too_many_pixels',
+                params={'limit': settings.UPLOAD_MAX_PIXELS // 10 ** 6},
+            )
+        side = settings.UPLOAD_IMAGE_MAX_SIDE
+        source.draft('RGB', (side, side))
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail((side, side), Image.LANCZOS)
+        transparent = image.mode in ('RGBA', 'LA') or (
+            image.mode == 'P' and 'transparency' in image.info
+        )
+    stem = os.path.splitext(os.path.basename(upload.name))[0]
+    if transparent:
+        name, content_type = f'{stem}.png', 'image/png'
+        image.convert('RGBA').save(output, 'PNG', optimize=True)
+    else:
+        name, content_type = f'{stem}.jpg', 'image/jpeg'
+        image.convert('RGB').save(
+            output, 'JPEG', quality=settings.UPLOAD_IMAGE_QUALITY,
+            optimize=True, progressive=True,
+        )
+    size = output.tell()
+    output.seek(0)
+    return UploadedFile(output, name, content_type, size)
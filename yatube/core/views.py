@@ -0,0 +1,10 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from . import metrics
+
+
+@staff_member_required
+def metrics_view(request):
+    """Сводка метрик запросов этого процесса в JSON."""
+    return JsonResponse(metrics.snapshot(), json_dumps_params={'indent': 2})
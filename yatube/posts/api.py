@@ -0,0 +1,135 @@
+"""JSON API лент только для чтения.
+
+Посты читаются через values(), без создания моделей и без
+шаблонов. ?fields= выбирает поля, ?limit= размер страницы,
+дальше лента листается по ?cursor=. /api/v1/posts/?ids=
+отдаёт несколько постов одним запросом.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from core.decorators import anonymous_page_cache
+
+from . import page_state
+from .models import Group, Post, User
+from .paginator import CursorPaginator, InvalidCursor
+
+FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+# параметры запроса, по которым различаются ответы в кэше
+PARAMS = ('ids', 'fields', 'limit', 'cursor')
+
+
+class ApiError(Exception):
+    pass
+
+
+def api_view(view):
+    """GET-представление API: ошибки отдаются в JSON."""
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except (ApiError, InvalidCursor) as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        except Http404:
+            return JsonResponse({'error': 'Не найдено'}, status=404)
+    return wrapper
+
+
+def _fields(request):
+    names = [name for name in request.GET.get('fields', '').split(',')
+             if name]
+    unknown = sorted(set(names) - set(FIELDS))
+    if unknown:
+        raise ApiError(f'Неизвестные поля: {", ".join(unknown)}')
+    return list(dict.fromkeys(names)) or list(FIELDS)
+
+
+def _columns(fields):
+    """Колонки values(): выбранные поля и ключ сортировки."""
+    return list(dict.fromkeys(
+        [FIELDS[name] for name in fields] + ['pub_date', 'id']
+    ))
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.POSTS_PER_PAGE))
+    except ValueError:
+        raise ApiError('limit должен быть числом')
+    return min(max(limit, 1), settings.API_MAX_LIMIT)
+
+
+def _serialize(rows, fields):
+    results = []
+    for row in rows:
+        item = {name: row[FIELDS[name]] for name in fields}
+        if 'image' in item:
+            item['image'] = item['image'] and default_storage.url(
+                item['image']
+            )
+        results.append(item)
+    return results
+
+
+def _feed(request, queryset):
+    fields = _fields(request)
+    paginator = CursorPaginator(
+        queryset.values(*_columns(fields)), per_page=_limit(request)
+    )
+    page = paginator.cursor_page(request.GET.get('cursor'))
+    return JsonResponse({
+        'results': _serialize(page, fields),
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    })
+
+
+@anonymous_page_cache(page_state.index, PARAMS)
+@api_view
+def posts(request):
+    """Главная лента или посты по ?ids=."""
+    if 'ids' not in request.GET:
+        return _feed(request, Post.objects.all())
+    try:
+        ids = [int(pk) for pk in request.GET['ids'].split(',') if pk]
+    except ValueError:
+        raise ApiError('ids должны быть числами')
+    if len(ids) > settings.API_MAX_LIMIT:
+        raise ApiError(f'Не больше {settings.API_MAX_LIMIT} ids')
+    fields = _fields(request)
+    rows = {
+        row['id']: row for row in
+        Post.objects.filter(pk__in=ids).order_by().values(*_columns(fields))
+    }
+    return JsonResponse({'results': _serialize(
+        [rows[pk] for pk in dict.fromkeys(ids) if pk in rows], fields
+    )})
+
+
+@anonymous_page_cache(page_state.group, PARAMS)
+@api_view
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return _feed(request, Post.objects.filter(group=group))
+
+
+@anonymous_page_cache(page_state.profile, PARAMS)
+@api_view
+def profile_posts(request, username):
+    author = get_object_or_404(User, username=username)
+    return _feed(request, Post.objects.filter(author=author))
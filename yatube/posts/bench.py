@@ -0,0 +1,293 @@
+"""Нагрузочные замеры страниц ленты.
+
+seed() заполняет базу синтетическими данными пачками bulk_create,
+measure() снимает для основных страниц перцентили времени ответа,
+число SQL-запросов и размер ответа, measure_templates() - время
+рендеринга шаблонов с кэширующим загрузчиком и без него,
+measure_compression() - размер и время сжатия ответов.
+Команды seed_bench и bench строят на них прогоны, результаты
+которых сравниваются между коммитами.
+"""
+import copy
+import random
+import re
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from core import compression, template_backends
+
+from . import counters, feed, search
+from .models import Comment, Follow, Group, Post, User
+
+# Django 2.2 вставляет пачку в SQLite одним составным SELECT,
+# а в нём не больше 500 частей; явный batch_size не уменьшается
+BATCH_SIZE = 500
+USERNAME_PREFIX = 'bench_'
+# кэш прогонов bench: seed() и замеры очищают кэш, а общий
+# кэш из CACHE_URL трогать нельзя
+LOCAL_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench',
+    },
+}
+
+WORDS = (
+    'лента', 'пост', 'автор', 'сообщество', 'подписка', 'комментарий',
+    'кэш', 'запрос', 'страница', 'индекс', 'курсор', 'картинка',
+)
+
+
+def sizes_for(posts):
+    """Объёмы остальных данных для прогона с posts постами."""
+    users = max(10, posts // 10)
+    return {
+        'users': users,
+        'groups': max(2, posts // 100),
+        'posts': posts,
+        'comments': posts * 2,
+        'follows': min(users * 10, users * (users - 1)),
+    }
+
+
+def is_test_database():
+    """Подключена ли тестовая база (create_test_db), а не рабочая."""
+    return (connection.settings_dict['NAME']
+            == connection.creation._get_test_db_name())
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def seed(users, groups, posts, comments, follows, random_seed=0):
+    """Создаёт пользователей, сообщества, посты, комментарии и
+    подписки, затем пересчитывает счётчики, ленты подписок
+    и поисковый индекс.
+
+    Первый пользователь (bench_0) - читатель: десятая часть
+    подписок приходится на него.
+    """
+    rng = random.Random(random_seed)
+    start = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+    User.objects.bulk_create(
+        (User(username=f'{USERNAME_PREFIX}{start + i}', password='!')
+         for i in range(users)),
+        batch_size=BATCH_SIZE,
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith=USERNAME_PREFIX)
+        .order_by('id').values_list('id', flat=True)
+    )
+    start = Group.objects.filter(slug__startswith='bench-').count()
+    Group.objects.bulk_create(
+        (Group(title=f'Сообщество {start + i}', slug=f'bench-{start + i}',
+               description=_text(rng, 8))
+         for i in range(groups)),
+        batch_size=BATCH_SIZE,
+    )
+    group_ids = list(Group.objects.values_list('id', flat=True)) + [None]
+    Post.objects.bulk_create(
+        (Post(text=_text(rng, rng.randint(5, 60)),
+              author_id=rng.choice(user_ids),
+              group_id=rng.choice(group_ids))
+         for _ in range(posts)),
+        batch_size=BATCH_SIZE,
+    )
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    Comment.objects.bulk_create(
+        (Comment(post_id=rng.choice(post_ids), author_id=rng.choice(user_ids),
+                 text=_text(rng, rng.randint(3, 20)))
+         for _ in range(comments)),
+        batch_size=BATCH_SIZE,
+    )
+    existing = set(Follow.objects.values_list('user_id', 'author_id'))
+    reader, authors = user_ids[0], user_ids[1:]
+    pairs = {(reader, author) for author in authors[:max(1, follows // 10)]}
+    attempts = 0
+    while len(pairs) < follows and attempts < follows * 10:
+        attempts += 1
+        pairs.add(tuple(rng.sample(user_ids, 2)))
+    pairs -= existing
+    Follow.objects.bulk_create(
+        (Follow(user_id=user, author_id=author) for user, author in pairs),
+        batch_size=BATCH_SIZE,
+    )
+    counters.recount_comments()
+    counters.recount_users()
+    feed.rebuild_feeds()
+    search.rebuild()
+    cache.clear()
+
+
+def _targets():
+    """Адреса замеряемых страниц и читатель для ленты подписок."""
+    reader = User.objects.filter(
+        username__startswith=USERNAME_PREFIX
+    ).order_by('id').first()
+    group = Group.objects.annotate(total=Count('posts')).order_by(
+        '-total'
+    ).first()
+    author = User.objects.order_by('-stats__followers_count').first()
+    post = Post.objects.select_related('author').order_by(
+        '-comment_count', '-id'
+    ).first()
+    pages = {
+        'index': reverse('index'),
+        'group_posts': reverse('group_posts', args=[group.slug]),
+        'profile': reverse('profile', args=[author.username]),
+        'post_view': reverse('post', args=[post.author.username, post.id]),
+        'follow_index': reverse('follow_index'),
+    }
+    return pages, reader
+
+
+def percentile(values, percent):
+    """Перцентиль по ближайшему рангу."""
+    ordered = sorted(values)
+    rank = max(1, round(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(requests=20, pages=None):
+    """Замеряет страницы и возвращает список результатов.
+
+    Каждая страница открывается гостем и читателем, с холодным
+    (очищенным перед каждым запросом) и тёплым кэшем. Лента
+    подписок доступна только читателю.
+    """
+    targets, reader = _targets()
+    clients = {'guest': Client(), 'reader': Client()}
+    clients['reader'].force_login(reader)
+    results = []
+    for page, address in targets.items():
+        if pages and page not in pages:
+            continue
+        for client_name, client in clients.items():
+            if page == 'follow_index' and client_name == 'guest':
+                continue
+            for cache_state in ('cold', 'warm'):
+                cache.clear()
+                client.get(address)
+                timings, queries, sizes = [], [], []
+                for _ in range(requests):
+                    if cache_state == 'cold':
+                        cache.clear()
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = client.get(address)
+                        timings.append(time.perf_counter() - started)
+                    queries.append(len(captured))
+                    sizes.append(len(response.content))
+                results.append({
+                    'page': page,
+                    'client': client_name,
+                    'cache': cache_state,
+                    'status': response.status_code,
+                    'requests': requests,
+                    'p50_ms': round(percentile(timings, 50) * 1000, 3),
+                    'p90_ms': round(percentile(timings, 90) * 1000, 3),
+                    'p99_ms': round(percentile(timings, 99) * 1000, 3),
+                    'mean_ms': round(statistics.mean(timings) * 1000, 3),
+                    'queries': round(statistics.mean(queries), 2),
+                    'bytes': round(statistics.mean(sizes)),
+                })
+    return results
+
+
+# 'debug' - загрузчики режима DEBUG; без DEBUG Django 2.2 и сам
+# берёт кэширующий загрузчик, поэтому он и есть базовый вариант
+TEMPLATE_LOADERS = {
+    'debug': settings.PLAIN_TEMPLATE_LOADERS,
+    'cached': [
+        ('django.template.loaders.cached.Loader',
+         settings.PLAIN_TEMPLATE_LOADERS),
+    ],
+}
+_TEMPLATE_TIME = re.compile(r'tpl;dur=([\d.]+)')
+
+
+def measure_templates(requests=20, pages=('index', 'profile')):
+    """Время рендеринга шаблонов страниц гостю по Server-Timing
+    с загрузчиками режима DEBUG и с кэширующим.
+
+    first_ms - первый запрос страницы без warm_up(), как в
+    только что запущенном воркере; warm_ms - первый запрос после
+    warm_up(); p50 и среднее - по следующим запросам. Кэш
+    очищается перед каждым запросом, чтобы страница рендерилась
+    целиком.
+    """
+    targets, _ = _targets()
+    client = Client()
+
+    def render_ms(page):
+        cache.clear()
+        response = client.get(targets[page])
+        return float(_TEMPLATE_TIME.search(
+            response['Server-Timing']
+        ).group(1))
+
+    results = []
+    for loader, loaders in TEMPLATE_LOADERS.items():
+        templates = copy.deepcopy(settings.TEMPLATES)
+        templates[0]['OPTIONS']['loaders'] = loaders
+        first = {}
+        with override_settings(TEMPLATES=templates):
+            for page in pages:
+                first[page] = render_ms(page)
+        with override_settings(TEMPLATES=templates):
+            template_backends.warm_up()
+            for page in pages:
+                warm = render_ms(page)
+                timings = [render_ms(page) for _ in range(requests)]
+                results.append({
+                    'page': page,
+                    'loader': loader,
+                    'requests': requests,
+                    'first_ms': round(first[page], 3),
+                    'warm_ms': round(warm, 3),
+                    'p50_ms': round(percentile(timings, 50), 3),
+                    'mean_ms': round(statistics.mean(timings), 3),
+                })
+    return results
+
+
+def measure_compression(requests=20, pages=('index', 'post_view')):
+    """Байты ответа гостю без сжатия и в каждой доступной
+    кодировке, время ответа и процессорное время самого сжатия.
+    """
+    targets, _ = _targets()
+    client = Client()
+    results = []
+    for page in pages:
+        body = client.get(targets[page]).content
+        for encoding in ('identity',) + compression.available():
+            timings, cpu = [], []
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = client.get(
+                    targets[page], HTTP_ACCEPT_ENCODING=encoding
+                )
+                timings.append(time.perf_counter() - started)
+                started = time.process_time()
+                if encoding != 'identity':
+                    compression.compress(body, encoding)
+                cpu.append(time.process_time() - started)
+            results.append({
+                'page': page,
+                'encoding': response.get('Content-Encoding', 'identity'),
+                'requests': requests,
+                'bytes': len(response.content),
+                'ratio': round(len(response.content) / len(body), 3),
+                'p50_ms': round(percentile(timings, 50) * 1000, 3),
+                'compress_ms': round(statistics.mean(cpu) * 1000, 3),
+            })
+    return results
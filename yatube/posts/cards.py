@@ -0,0 +1,85 @@
+"""Кэш готового HTML карточек постов.
+
+Ключ карточки - id поста, версия (хэш всего, что карточка
+показывает из строки поста: текст, автор, сообщество, счётчик
+комментариев, картинка) и флаги кнопок «Просмотр» и
+«Редактировать», зависящие от страницы и читателя. Поэтому
+правка поста сама даёт новый ключ, а старая карточка
+вытесняется по таймауту. Карточки страницы читаются одним
+get_many, отсутствующие рендерятся шаблоном и сохраняются.
+Посты с картинкой без готовых вариантов не кэшируются:
+их вид меняется, когда варианты будут созданы. Карточки запроса,
+читавшего реплику, тоже: реплика может отставать от версии.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+
+from core import routers
+
+from . import variants
+from .templatetags.card_thumbnails import card_thumbnails
+
+TEMPLATE = 'includes/post_item.html'
+PREFIX = 'card'
+
+
+def version(post):
+    """Хэш полей поста, которые показывает карточка."""
+    raw = '\x1f'.join(map(str, (
+        post.text, post.pub_date.isoformat(), post.author.username,
+        post.group_id and post.group.slug, post.group_id and post.group.title,
+        post.comment_count, post.image.name or '', post.image_variants,
+    )))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def key(post, view_button, edit_button):
+    return (
+        f'{PREFIX}:{post.pk}:{version(post)}:'
+        f'{int(view_button)}{int(edit_button)}'
+    )
+
+
+def cacheable(post):
+    return not post.image or bool(variants.load(post))
+
+
+def render(posts, request=None, view_button=False, edit_button=False):
+    """HTML карточек постов страницы.
+
+    edit_button - показывать ли автору кнопку редактирования;
+    остальным читателям она не нужна, и флаг в ключе снимается.
+    """
+    posts = list(posts)
+    user_id = getattr(getattr(request, 'user', None), 'pk', None)
+    keys = {
+        post.pk: key(
+            post, view_button, edit_button and post.author_id == user_id
+        )
+        for post in posts if cacheable(post)
+    }
+    found = cache.get_many(list(keys.values())) if keys else {}
+    missing = [post for post in posts if keys.get(post.pk) not in found]
+    card_thumbnails(missing)
+    template = get_template(TEMPLATE)
+    rendered = {}
+    for post in missing:
+        # без контекстных процессоров: карточке нужен только request
+        rendered[post.pk] = template.render({
+            'post': post,
+            'request': request,
+            'is_need_view_button': view_button,
+            'is_need_edit_button': edit_button,
+        })
+    fresh = {
+        keys[pk]: html for pk, html in rendered.items() if pk in keys
+    }
+    if fresh and not routers.used_replica():
+        cache.set_many(fresh, settings.CARD_CACHE_TIMEOUT)
+    return ''.join(
+        rendered[post.pk] if post.pk in rendered else found[keys[post.pk]]
+        for post in posts
+    )
@@ -0,0 +1,110 @@
+"""Денормализованные счётчики подписок, постов и комментариев.
+
+Сигналы поддерживают счётчики инкрементами F(), а функции
+recount_* пересчитывают их целиком. recount_* принимают реестр
+приложений, чтобы их можно было вызывать и из миграций.
+"""
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 500
+
+
+def _count(queryset, field):
+    """Подзапрос: число строк queryset для текущего OuterRef('pk')."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0
+    )
+
+
+def recount_comments(apps=global_apps):
+    """Пересчитывает Post.comment_count одним UPDATE."""
+    Comment = apps.get_model('posts', 'Comment')
+    Post = apps.get_model('posts', 'Post')
+    return Post.objects.update(
+        comment_count=_count(Comment.objects.all(), 'post')
+    )
+
+
+def recount_users(apps=global_apps):
+    """Пересоздаёт UserStats для всех пользователей пачками."""
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    UserStats = apps.get_model('posts', 'UserStats')
+    users = User.objects.annotate(
+        followers_total=_count(Follow.objects.all(), 'author'),
+        following_total=_count(Follow.objects.all(), 'user'),
+        posts_total=_count(Post.objects.all(), 'author'),
+    ).values_list(
+        'pk', 'followers_total', 'following_total', 'posts_total'
+    )
+    with transaction.atomic():
+        UserStats.objects.all().delete()
+        batch = []
+        for pk, followers, following, posts in users.iterator():
+            batch.append(UserStats(
+                user_id=pk,
+                followers_count=followers,
+                following_count=following,
+                posts_count=posts,
+            ))
+            if len(batch) >= BATCH_SIZE:
+                UserStats.objects.bulk_create(batch)
+                batch = []
+        UserStats.objects.bulk_create(batch)
+    return users.count()
+
+
+def recount_user(user_id):
+    """Пересчитывает счётчики одного пользователя."""
+    from .models import Follow, Post, UserStats
+    stats, _ = UserStats.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            'followers_count': Follow.objects.filter(
+                author_id=user_id
+            ).count(),
+            'following_count': Follow.objects.filter(
+                user_id=user_id
+            ).count(),
+            'posts_count': Post.objects.filter(author_id=user_id).count(),
+        }
+    )
+    return stats
+
+
+def change_user_stats(user_id, delta, *fields):
+    """Сдвигает счётчики пользователя на delta.
+
+    При увеличении недостающая строка UserStats создаётся
+    пересчётом; уменьшение не опускает счётчик ниже нуля.
+    """
+    from .models import UserStats
+    with transaction.atomic():
+        for field in fields:
+            rows = UserStats.objects.filter(user_id=user_id)
+            if delta < 0:
+                rows = rows.filter(**{f'{field}__gte': -delta})
+            updated = rows.update(**{field: F(field) + delta})
+            if not updated and delta > 0:
+                recount_user(user_id)
+                return
+
+
+def change_comment_count(post_id, delta):
+    from .models import Post
+    rows = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        rows = rows.filter(comment_count__gte=-delta)
+    rows.update(comment_count=F('comment_count') + delta)
@@ -0,0 +1,156 @@
+"""Материализованная лента подписок (fan-out on write).
+
+Новый пост раскладывается в FeedEntry подписчиков автора
+фоновой задачей после коммита (см. core.jobs), подписка
+подтягивает последние посты автора, отписка их убирает.
+Для авторов, у которых подписчиков не меньше FEED_FANOUT_LIMIT,
+раскладка при публикации отключена: их посты подтягиваются в ленту
+читателя при открытии страницы подписок (pull).
+"""
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db.models import Max
+
+from . import versions
+
+BATCH_SIZE = 500
+
+
+def is_pull_author(author_id):
+    from .models import UserStats
+    return UserStats.objects.filter(
+        user_id=author_id,
+        followers_count__gte=settings.FEED_FANOUT_LIMIT
+    ).exists()
+
+
+def _entries(user_id, posts):
+    from .models import FeedEntry
+    return [
+        FeedEntry(user_id=user_id, post_id=post_id, author_id=author_id,
+                  pub_date=pub_date)
+        for post_id, author_id, pub_date in posts
+    ]
+
+
+def _save(entries, model=None):
+    if model is None:
+        from .models import FeedEntry as model
+    model.objects.bulk_create(
+        entries, batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def fan_out(post_id):
+    """Раскладывает новый пост по лентам подписчиков автора.
+
+    Вызывается фоновой задачей после коммита поста. Версии лент
+    подписчиков (через версию автора) меняются после вставки записей:
+    фрагмент, сохранённый между публикацией и раскладкой, без нового
+    поста, не читается.
+    """
+    from .models import FeedEntry, Follow, Post
+    post = Post.objects.filter(pk=post_id).only(
+        'author_id', 'pub_date'
+    ).first()
+    if post is None or is_pull_author(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    batch = []
+    for user_id in followers.iterator():
+        batch.append(FeedEntry(user_id=user_id, post_id=post.pk,
+                               author_id=post.author_id,
+                               pub_date=post.pub_date))
+        if len(batch) >= BATCH_SIZE:
+            _fan_out_batch(batch, post.author_id)
+            batch = []
+    _fan_out_batch(batch, post.author_id)
+
+
+def _fan_out_batch(entries, author_id):
+    _save(entries)
+    versions.bump(versions.author_key(author_id))
+
+
+def backfill(user_id, author_id, since=None):
+    """Добавляет в ленту пользователя посты автора.
+
+    Без since - последние FEED_BACKFILL_SIZE постов (подписка),
+    с since - все посты новее since, которых ещё нет в ленте,
+    порциями по BATCH_SIZE: при pull ни один пост автора между
+    визитами читателя не теряется. Возвращает число добавленных
+    записей.
+    """
+    from .models import Post
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id'
+    ).values_list('id', 'author_id', 'pub_date')
+    if since is None:
+        posts = list(posts[:settings.FEED_BACKFILL_SIZE])
+        _save(_entries(user_id, posts))
+        return len(posts)
+    posts = posts.filter(pub_date__gte=since).exclude(
+        feed_entries__user_id=user_id
+    )
+    added = 0
+    batch = []
+    for post in posts.iterator(chunk_size=BATCH_SIZE):
+        batch.append(post)
+        if len(batch) >= BATCH_SIZE:
+            _save(_entries(user_id, batch))
+            added += len(batch)
+            batch = []
+    _save(_entries(user_id, batch))
+    return added + len(batch)
+
+
+def remove(user_id, author_id):
+    """Убирает посты автора из ленты пользователя."""
+    from .models import FeedEntry
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def pull(user):
+    """Подтягивает в ленту новые посты авторов без fan-out.
+
+    Возвращает число добавленных записей.
+    """
+    from .models import FeedEntry, Follow
+    authors = list(Follow.objects.filter(
+        user=user,
+        author__stats__followers_count__gte=settings.FEED_FANOUT_LIMIT
+    ).values_list('author_id', flat=True))
+    if not authors:
+        return 0
+    latest = dict(
+        FeedEntry.objects.filter(user=user, author_id__in=authors)
+        .values('author_id')
+        .annotate(latest=Max('pub_date'))
+        .values_list('author_id', 'latest')
+    )
+    return sum(
+        backfill(user.pk, author_id, since=latest.get(author_id))
+        for author_id in authors
+    )
+
+
+def rebuild_feeds(apps=global_apps):
+    """Заново собирает ленты всех подписчиков."""
+    FeedEntry = apps.get_model('posts', 'FeedEntry')
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    FeedEntry.objects.all().delete()
+    follows = Follow.objects.values_list('user_id', 'author_id')
+    for user_id, author_id in follows.iterator():
+        posts = Post.objects.filter(author_id=author_id).order_by(
+            '-pub_date', '-id'
+        ).values_list('id', 'author_id', 'pub_date')
+        _save(
+            [FeedEntry(user_id=user_id, post_id=post_id,
+                       author_id=author_id, pub_date=pub_date)
+             for post_id, author_id, pub_date
+             in posts[:settings.FEED_BACKFILL_SIZE]],
+            model=FeedEntry
+        )
@@ -1,6 +1,9 @@
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import ModelForm
 from django.utils.translation import gettext_lazy as _
 
+from core.uploads import process_image, size_error
+
 from .models import Comment, Post
 
 
@@ -18,6 +21,22 @@ class PostForm(ModelForm):
             'image': _('Загрузите изображение.'),
         }
 
+    def __init__(self, *args, upload_too_large=False, **kwargs):
+        """upload_too_large - загрузка прервана из-за размера
+        (core.uploads.too_large): файла в files нет, ошибку
+        выдаст clean_image.
+        """
+        super().__init__(*args, **kwargs)
+        self.upload_too_large = upload_too_large
+
+    def clean_image(self):
+        if self.upload_too_large:
+            raise size_error()
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            return process_image(image)
+        return image
+
 
 class CommentForm(ModelForm):
     class Meta:
@@ -0,0 +1,159 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+
+from posts import bench
+
+KEY_FIELDS = ('size', 'page', 'client', 'cache')
+COMPARED = ('p50_ms', 'p90_ms', 'queries', 'bytes')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет страницы ленты на синтетических данных нескольких '
+        'объёмов во временной тестовой базе и пишет результаты в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='100,1000,10000',
+            help='Числа постов через запятую.',
+        )
+        parser.add_argument('--requests', type=int, default=20)
+        parser.add_argument(
+            '--pages', help='Только эти страницы, через запятую.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', default='bench.json', help='Файл результатов.'
+        )
+        parser.add_argument(
+            '--compare', help='Прошлый файл результатов для сравнения.'
+        )
+        parser.add_argument(
+            '--templates', action='store_true',
+            help='Сравнить время рендеринга шаблонов с загрузчиками '
+                 'режима DEBUG и с кэширующим, до и после warm_up().',
+        )
+        parser.add_argument(
+            '--compression', action='store_true',
+            help='Замерить размер ответов и время их сжатия '
+                 'gzip и brotli.',
+        )
+
+    @override_settings(CACHES=bench.LOCAL_CACHES)
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        pages = options['pages'] and options['pages'].split(',')
+        results = []
+        # дополнительные замеры: опция и ключ в JSON -> функция и отчёт
+        extra = {
+            name: (measure, report, [])
+            for name, measure, report in (
+                ('templates', bench.measure_templates,
+                 self.report_templates),
+                ('compression', bench.measure_compression,
+                 self.report_compression),
+            )
+            if options[name]
+        }
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            for size in sizes:
+                call_command('flush', interactive=False, verbosity=0)
+                with transaction.atomic():
+                    bench.seed(random_seed=options['seed'],
+                               **bench.sizes_for(size))
+                for result in bench.measure(options['requests'], pages):
+                    results.append({'size': size, **result})
+                    self.report(results[-1])
+                for measure, report, rows in extra.values():
+                    for result in measure(options['requests']):
+                        rows.append({'size': size, **result})
+                        report(rows[-1])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        with open(options['output'], 'w') as output:
+            data = {'meta': self.meta(), 'results': results}
+            for name, (_, _, rows) in extra.items():
+                data[name] = rows
+            json.dump(data, output, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты записаны в {options["output"]}.'
+        ))
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def meta(self):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'date': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'cache': settings.CACHES['default']['BACKEND'],
+        }
+
+    def report(self, result):
+        self.stdout.write(
+            '{size:>7} {page:<13} {client:<7} {cache:<5} '
+            'p50 {p50_ms:>8.2f} мс  p90 {p90_ms:>8.2f} мс  '
+            'запросов {queries:>5}  байт {bytes:>7}'.format(**result)
+        )
+
+    def report_templates(self, result):
+        self.stdout.write(
+            '{size:>7} {page:<13} шаблоны {loader:<6} '
+            'первый {first_ms:>8.2f} мс  после warm_up {warm_ms:>8.2f} мс  '
+            'p50 {p50_ms:>8.2f} мс  среднее {mean_ms:>8.2f} мс'
+            .format(**result)
+        )
+
+    def report_compression(self, result):
+        self.stdout.write(
+            '{size:>7} {page:<13} {encoding:<8} байт {bytes:>7} '
+            '({ratio:.0%})  p50 {p50_ms:>8.2f} мс  '
+            'сжатие {compress_ms:>6.2f} мс'
+            .format(**result)
+        )
+
+    def compare(self, path, results):
+        with open(path) as source:
+            previous = json.load(source)
+        old = {
+            tuple(row[field] for field in KEY_FIELDS): row
+            for row in previous['results']
+        }
+        self.stdout.write(
+            f'Сравнение с {previous["meta"].get("commit") or path}:'
+        )
+        for row in results:
+            before = old.get(tuple(row[field] for field in KEY_FIELDS))
+            if before is None:
+                continue
+            changes = []
+            for field in COMPARED:
+                if before[field]:
+                    delta = (row[field] - before[field]) / before[field]
+                    changes.append(f'{field} {delta:+.0%}')
+            self.stdout.write('{size:>7} {page:<13} {client:<7} {cache:<5} '
+                              .format(**row) + '  '.join(changes))
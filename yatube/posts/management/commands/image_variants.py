@@ -0,0 +1,43 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts import thumbnails, variants
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт адаптивные варианты картинок существующих постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов; 0 - без пула, в текущем процессе.',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать варианты и для постов, где они уже есть.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image=None).only(
+            'id', 'image', 'image_variants'
+        )
+        ids = [
+            post.id for post in posts.iterator()
+            if options['all'] or not variants.load(post)
+        ]
+        if options['workers']:
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options['workers'], initializer=django.setup
+            ) as executor:
+                done = sum(executor.map(thumbnails.work, ids, chunksize=8))
+        else:
+            done = sum(thumbnails.generate(post_id) for post_id in ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Созданы варианты картинок: {done} из {len(ids)} постов.'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики подписок, постов и комментариев.'
+
+    def handle(self, *args, **options):
+        posts = counters.recount_comments()
+        users = counters.recount_users()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано постов: {posts}, пользователей: {users}.'
+        ))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts import bench
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими данными для замеров. Пересобирает '
+        'все ленты подписок и очищает кэш, поэтому рабочую базу '
+        'заполняет только с --force.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=1000,
+            help='Число постов; остальные объёмы считаются от него.',
+        )
+        for name in ('users', 'groups', 'comments', 'follows'):
+            parser.add_argument(f'--{name}', type=int)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Заполнить рабочую, а не тестовую базу.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['force'] and not bench.is_test_database():
+            raise CommandError(
+                'База не тестовая: seed_bench пересоберёт все ленты '
+                'подписок и очистит кэш. Запустите с --force, если '
+                'это нужно.'
+            )
+        sizes = bench.sizes_for(options['posts'])
+        for name in sizes:
+            if options.get(name) is not None:
+                sizes[name] = options[name]
+        with transaction.atomic():
+            bench.seed(random_seed=options['seed'], **sizes)
+        self.stdout.write(self.style.SUCCESS(
+            'Созданы: ' + ', '.join(f'{k} {v}' for k, v in sizes.items())
+        ))
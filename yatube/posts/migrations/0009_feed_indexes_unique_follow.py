@@ -0,0 +1,44 @@
+# Generated by Django 2.2.6 on 2026-10-17 01:05
+
+from django.db import migrations, models
+from django.db.models import Min
+
+from posts import counters
+
+
+def dedupe_follows(apps, schema_editor):
+    """Оставляет по одной подписке на каждую пару (user, author)."""
+    Follow = apps.get_model('posts', 'Follow')
+    first_follows = Follow.objects.values('user', 'author').annotate(
+        first_id=Min('id')
+    ).values('first_id')
+    deleted, _ = Follow.objects.exclude(id__in=first_follows).delete()
+    if deleted:
+        counters.recount_users(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_userstats_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-pub_date', '-id'], name='post_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='post_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date', '-id'], name='post_group_pub_date_idx'),
+        ),
+        migrations.RunPython(dedupe_follows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_follow'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.6 on 2026-10-17 02:10
+
+from django.db import migrations
+
+from posts import search
+
+
+def create_index(apps, schema_editor):
+    search.create_index(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    search.drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_comment_post_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,40 @@
+"""Состояние страниц для anonymous_page_cache.
+
+Каждая функция принимает аргументы представления и возвращает
+версию ленты страницы или None, если страницы нет. Время
+последнего изменения не возвращается: правки, удаления и
+переименования меняют версию, но не дату последнего поста.
+"""
+from . import versions
+from .models import Group, Post, User
+
+
+def index(request):
+    return versions.get(versions.index_key())
+
+
+def group(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True
+    ).first()
+    if group_id is None:
+        return None
+    return versions.get(versions.group_key(group_id))
+
+
+def profile(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'id', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    return versions.get(versions.author_key(author_id))
+
+
+def post(request, username, post_id):
+    author_id = Post.objects.filter(
+        pk=post_id, author__username=username
+    ).values_list('author_id', flat=True).first()
+    if author_id is None:
+        return None
+    return versions.get(versions.author_key(author_id))
@@ -0,0 +1,197 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage(Page):
+    """Страница ленты, открытая по курсору.
+
+    Номера у такой страницы нет: соседние страницы
+    доступны по previous_cursor и next_cursor.
+    """
+
+    def __init__(self, object_list, paginator, cursor,
+                 previous_cursor=None, next_cursor=None):
+        super().__init__(object_list, None, paginator)
+        self.cursor = cursor
+        self.position = cursor
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+
+    def __repr__(self):
+        return f'<Page {self.cursor}>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class CursorPaginator(Paginator):
+    """Пагинатор по ключу сортировки вместо OFFSET.
+
+    Первые max_pages страниц доступны по номеру, как у обычного
+    Paginator: COUNT и OFFSET при этом ограничены сверху.
+    Дальше лента листается по непрозрачным курсорам ?cursor=,
+    которые хранят значения полей ordering последней записи.
+    Последнее поле ordering должно быть уникальным.
+    """
+
+    def __init__(self, object_list, per_page=None,
+                 ordering=('-pub_date', '-id'), max_pages=None, **kwargs):
+        if per_page is None:
+            per_page = settings.POSTS_PER_PAGE
+        if max_pages is None:
+            max_pages = settings.PAGINATOR_MAX_PAGES
+        self.ordering = tuple(ordering)
+        self.max_pages = max_pages
+        super().__init__(
+            object_list.order_by(*self.ordering), per_page, **kwargs
+        )
+
+    @cached_property
+    def _bounded_count(self):
+        limit = self.per_page * self.max_pages
+        return self.object_list[:limit + 1].count()
+
+    @cached_property
+    def count(self):
+        return min(self._bounded_count, self.per_page * self.max_pages)
+
+    @property
+    def truncated(self):
+        """Есть ли записи за пределами нумерованных страниц."""
+        return self._bounded_count > self.count
+
+    def _get_page(self, *args, **kwargs):
+        page = super()._get_page(*args, **kwargs)
+        page.cursor = None
+        page.position = page.number
+        page.previous_cursor = None
+        page.next_cursor = None
+        if self.truncated and page.number == self.num_pages:
+            page.next_cursor = self.encode(page[len(page) - 1])
+        return page
+
+    def get_cursor_page(self, cursor):
+        """Возвращает страницу по курсору.
+
+        Если курсор испорчен или за ним ничего нет,
+        возвращает первую страницу.
+        """
+        try:
+            return self.cursor_page(cursor)
+        except InvalidPage:
+            return self.page(1)
+
+    def cursor_page(self, cursor=None):
+        """Страница после курсора; без курсора - с начала ленты,
+        без COUNT.
+        """
+        queryset, backwards = self.object_list, False
+        if cursor:
+            values, backwards = self.decode(cursor)
+            ordering = self.ordering
+            if backwards:
+                ordering = tuple(_reverse(field) for field in ordering)
+            queryset = queryset.filter(
+                self._beyond(values, ordering)
+            ).order_by(*ordering)
+        rows = list(queryset[:self.per_page + 1])
+        if not rows:
+            if cursor:
+                raise InvalidCursor('За курсором нет записей')
+            return CursorPage(rows, self, cursor)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        previous_cursor = self.encode(rows[0], backwards=True)
+        next_cursor = self.encode(rows[-1])
+        if not has_more:
+            if backwards:
+                previous_cursor = None
+            else:
+                next_cursor = None
+        if not cursor:
+            previous_cursor = None
+        return CursorPage(rows, self, cursor, previous_cursor, next_cursor)
+
+    def encode(self, obj, backwards=False):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            values.append(value)
+        raw = json.dumps([int(backwards), values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            backwards, values = json.loads(raw.decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise InvalidCursor('Некорректный курсор')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidCursor('Некорректный курсор')
+        try:
+            values = [
+                self._field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise InvalidCursor('Некорректный курсор')
+        if any(value is None for value in values):
+            raise InvalidCursor('Некорректный курсор')
+        return values, bool(backwards)
+
+    def _field(self, name):
+        """Поле модели или аннотации, по которому идёт сортировка."""
+        try:
+            return self.object_list.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return self.object_list.query.annotations[name].output_field
+
+    @staticmethod
+    def _beyond(values, ordering):
+        """Условие «строго после values» для заданной сортировки.
+
+        Первое поле дополнительно ограничено сверху (снизу), чтобы
+        база могла пройти по индексу диапазоном.
+        """
+        names = [field.lstrip('-') for field in ordering]
+        ops = ['lt' if field.startswith('-') else 'gt' for field in ordering]
+        condition = Q()
+        for i, (name, op) in enumerate(zip(names, ops)):
+            term = Q(**{f'{name}__{op}': values[i]})
+            for prev_name, prev_value in zip(names[:i], values[:i]):
+                term &= Q(**{prev_name: prev_value})
+            condition |= term
+        first_op = 'lte' if ops[0] == 'lt' else 'gte'
+        return Q(**{f'{names[0]}__{first_op}': values[0]}) & condition
+
+
+def _reverse(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+def paginate(request, object_list, **kwargs):
+    """Возвращает страницу ленты по ?cursor= или ?page= из запроса."""
+    paginator = CursorPaginator(object_list, **kwargs)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        return paginator.get_cursor_page(cursor)
+    return paginator.get_page(request.GET.get('page'))
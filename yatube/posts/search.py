@@ -0,0 +1,175 @@
+"""Полнотекстовый поиск по постам.
+
+Индекс лежит в отдельной таблице TABLE: в SQLite это виртуальная
+таблица FTS5 с rowid поста, в PostgreSQL - tsvector текста поста
+с GIN-индексом. Сигналы Post обновляют индекс при сохранении
+и удалении; rebuild() заполняет его заново (команда rebuild_search).
+Результаты ранжируются: rank больше - пост ближе к запросу.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+
+TABLE = 'posts_post_search'
+
+_WORDS = re.compile(r'\w+')
+
+
+class SQLiteIndex:
+    create = (
+        f'CREATE VIRTUAL TABLE {TABLE} USING fts5('
+        f"text, tokenize='unicode61 remove_diacritics 2')",
+    )
+    drop = f'DROP TABLE IF EXISTS {TABLE}'
+    clear = f'DELETE FROM {TABLE}'
+    fill = (
+        f'INSERT INTO {TABLE} (rowid, text) SELECT id, text FROM posts_post'
+    )
+    remove = f'DELETE FROM {TABLE} WHERE rowid = %s'
+    add = f'INSERT INTO {TABLE} (rowid, text) VALUES (%s, %s)'
+    match = (
+        f'posts_post.id IN (SELECT rowid FROM {TABLE} '
+        f'WHERE {TABLE} MATCH %s)'
+    )
+    rank = (
+        f'SELECT -bm25({TABLE}) FROM {TABLE} '
+        f'WHERE {TABLE} MATCH %s AND rowid = posts_post.id'
+    )
+
+    @staticmethod
+    def query(text):
+        """Все слова запроса, каждое - как начало слова."""
+        words = _WORDS.findall(text.lower())
+        return ' '.join(f'"{word}"*' for word in words)
+
+    @staticmethod
+    def add_params(post_id, text):
+        return [post_id, text]
+
+    @staticmethod
+    def query_params(query):
+        return [query]
+
+    @staticmethod
+    def fill_params():
+        return []
+
+
+class PostgreSQLIndex:
+    create = (
+        f'CREATE TABLE {TABLE} ('
+        'post_id integer PRIMARY KEY '
+        'REFERENCES posts_post (id) ON DELETE CASCADE, '
+        'document tsvector NOT NULL)',
+        f'CREATE INDEX {TABLE}_document_idx ON {TABLE} USING GIN (document)',
+    )
+    drop = f'DROP TABLE IF EXISTS {TABLE}'
+    clear = f'DELETE FROM {TABLE}'
+    fill = (
+        f'INSERT INTO {TABLE} (post_id, document) '
+        'SELECT id, to_tsvector(%s::regconfig, text) FROM posts_post'
+    )
+    remove = f'DELETE FROM {TABLE} WHERE post_id = %s'
+    add = (
+        f'INSERT INTO {TABLE} (post_id, document) '
+        'VALUES (%s, to_tsvector(%s::regconfig, %s))'
+    )
+    match = (
+        f'posts_post.id IN (SELECT post_id FROM {TABLE} '
+        'WHERE document @@ plainto_tsquery(%s::regconfig, %s))'
+    )
+    rank = (
+        f'SELECT ts_rank_cd(document, plainto_tsquery(%s::regconfig, %s)) '
+        f'FROM {TABLE} WHERE post_id = posts_post.id'
+    )
+
+    @staticmethod
+    def query(text):
+        return text.strip()
+
+    @staticmethod
+    def add_params(post_id, text):
+        return [post_id, settings.SEARCH_CONFIG, text]
+
+    @staticmethod
+    def query_params(query):
+        return [settings.SEARCH_CONFIG, query]
+
+    @staticmethod
+    def fill_params():
+        return [settings.SEARCH_CONFIG]
+
+
+BACKENDS = {'sqlite': SQLiteIndex, 'postgresql': PostgreSQLIndex}
+
+
+def _backend(connection):
+    return BACKENDS[connection.vendor]
+
+
+def create_index(connection):
+    backend = _backend(connection)
+    with connection.cursor() as cursor:
+        for sql in backend.create:
+            cursor.execute(sql)
+    rebuild(connection)
+
+
+def drop_index(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(_backend(connection).drop)
+
+
+def rebuild(connection=None):
+    """Заполняет индекс заново по всем постам.
+    Возвращает число проиндексированных постов.
+    """
+    if connection is None:
+        from .models import Post
+        connection = connections[router.db_for_write(Post)]
+    backend = _backend(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(backend.clear)
+        cursor.execute(backend.fill, backend.fill_params())
+        return cursor.rowcount
+
+
+def index(post):
+    """Обновляет запись индекса для поста."""
+    connection = connections[router.db_for_write(type(post), instance=post)]
+    backend = _backend(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(backend.remove, [post.pk])
+        cursor.execute(backend.add, backend.add_params(post.pk, post.text))
+
+
+def remove(post):
+    connection = connections[router.db_for_write(type(post), instance=post)]
+    with connection.cursor() as cursor:
+        cursor.execute(_backend(connection).remove, [post.pk])
+
+
+def search(text, queryset=None):
+    """Посты, подходящие под запрос, с аннотацией rank.
+
+    Пустой запрос ничего не находит. Листать результаты нужно
+    по ('-rank', '-id').
+    """
+    from .models import Post
+    if queryset is None:
+        queryset = Post.objects.for_feed()
+    backend = _backend(connections[router.db_for_read(Post)])
+    query = backend.query(text)
+    if not query:
+        return queryset.annotate(
+            rank=Value(0.0, output_field=FloatField())
+        ).none()
+    params = backend.query_params(query)
+    # RawSQL в id__in превратился бы в IN ((SELECT ...)), а такое
+    # выражение SQLite считает списком из одного значения
+    return queryset.extra(where=[backend.match], params=params).annotate(
+        rank=RawSQL(backend.rank, params, output_field=FloatField())
+    )
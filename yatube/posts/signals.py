@@ -0,0 +1,118 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import jobs
+
+from . import counters, feed, search, variants, versions
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+# поля пользователя, которые показывают страницы лент
+USER_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=User)
+def remember_user_names(sender, instance, raw, update_fields, **kwargs):
+    """Запоминает прежние имена пользователя; сохранение без
+    этих полей (например, last_login при входе) не читает базу.
+    """
+    instance._saved_names = None
+    if raw or not instance.pk:
+        return
+    if update_fields is not None and not set(update_fields) & set(
+        USER_FIELDS
+    ):
+        return
+    instance._saved_names = User.objects.filter(pk=instance.pk).values_list(
+        *USER_FIELDS
+    ).first()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw, **kwargs):
+    saved = getattr(instance, '_saved_names', None)
+    names = tuple(getattr(instance, field) for field in USER_FIELDS)
+    if saved is not None and saved != names:
+        versions.bump(*versions.user_keys(instance.pk))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        versions.bump(*versions.group_keys(instance.pk))
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_group(sender, instance, raw, **kwargs):
+    """Запоминает прежнее сообщество редактируемого поста."""
+    instance._saved_group_id = None
+    if instance.pk and not raw:
+        instance._saved_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.change_user_stats(instance.author_id, 1, 'posts_count')
+        jobs.defer(feed.fan_out, instance.pk, key=f'fan_out:{instance.pk}')
+    search.index(instance)
+    versions.bump(*versions.post_keys(
+        instance, getattr(instance, '_saved_group_id', None)
+    ))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_user_stats(instance.author_id, -1, 'posts_count')
+    search.remove(instance)
+    versions.bump(*versions.post_keys(instance))
+    # файлы удаляются задачей после коммита: при откате
+    # транзакции пост остаётся со своими вариантами
+    names = variants.names(instance)
+    if names:
+        jobs.defer(variants.delete_files, *names)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        counters.change_user_stats(instance.author_id, 1, 'followers_count')
+        counters.change_user_stats(instance.user_id, 1, 'following_count')
+        feed.backfill(instance.user_id, instance.author_id)
+        versions.bump(versions.follower_key(instance.user_id),
+                      versions.author_key(instance.author_id))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.change_user_stats(instance.author_id, -1, 'followers_count')
+    counters.change_user_stats(instance.user_id, -1, 'following_count')
+    feed.remove(instance.user_id, instance.author_id)
+    versions.bump(versions.follower_key(instance.user_id),
+                  versions.author_key(instance.author_id))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.change_comment_count(instance.post_id, 1)
+    versions.bump(*versions.post_keys(instance.post))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.change_comment_count(instance.post_id, -1)
+    post = Post.objects.filter(pk=instance.post_id).first()
+    if post is not None:
+        versions.bump(*versions.post_keys(post))
@@ -0,0 +1,94 @@
+"""Потоковый рендеринг страниц ленты.
+
+Шаблон страницы рендерится без карточек: тег post_cards
+оставляет на их месте метку с флагами кнопок. Начало страницы
+до метки (head, навигация, заголовок) уходит клиенту сразу,
+затем посты страницы читаются из базы порциями
+STREAM_CHUNK_SIZE и отдаются готовыми карточками (см. cards),
+последним - остаток страницы с пагинатором.
+
+Фрагменты {% cache %} страниц общие для обоих режимов:
+фрагмент с меткой, закэшированный потоковым ответом, обычный
+рендеринг заполняет карточками сам, а фрагмент с карточками
+потоковый ответ отдаёт одной частью.
+
+Части тела готовятся после возврата из middleware, поэтому
+TimingMiddleware и ReplicaMiddleware оборачивают
+streaming_content: SQL тела попадает в метрики и проверку N+1,
+а чтение идёт с той же базы, что и до ответа.
+
+Поток включается STREAM_FEEDS и только для авторизованных
+пользователей: страницы гостей целиком хранит
+anonymous_page_cache, а потоковый ответ в кэш не попадает.
+"""
+import re
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
+from django.template import loader
+
+from . import cards
+
+# переменная контекста, по которой post_cards ставит метку
+CONTEXT_FLAG = 'stream_cards'
+_MARKER = '<!-- post-cards {view:d}{edit:d} -->'
+_MARKER_PATTERN = re.compile(r'<!-- post-cards ([01])([01]) -->')
+
+
+def enabled(request):
+    return settings.STREAM_FEEDS and request.user.is_authenticated
+
+
+def marker(view_button, edit_button):
+    return _MARKER.format(view=view_button, edit=edit_button)
+
+
+def render(request, template_name, context):
+    """Ответ страницы ленты с context['page']: потоковый,
+    если он включён для запроса, иначе обычный render().
+    """
+    template = loader.get_template(template_name)
+    if not enabled(request):
+        html = template.render(context, request)
+        return HttpResponse(''.join(_fill(html, request, context['page'])))
+    return StreamingHttpResponse(
+        _content(request, template, context),
+        content_type='text/html; charset=utf-8',
+    )
+
+
+def _content(request, template, context):
+    html = template.render({**context, CONTEXT_FLAG: True}, request)
+    yield from _fill(html, request, context['page'])
+
+
+def _fill(html, request, page):
+    """Части страницы: начало до метки, карточки порциями
+    и остаток; страница без метки - одной частью.
+    """
+    match = _MARKER_PATTERN.search(html)
+    if match is None:
+        yield html
+        return
+    yield html[:match.start()]
+    view_button, edit_button = (flag == '1' for flag in match.groups())
+    for chunk in _chunks(page.object_list):
+        yield cards.render(chunk, request, view_button, edit_button)
+    yield html[match.end():]
+
+
+def _chunks(posts):
+    """Посты порциями по STREAM_CHUNK_SIZE; QuerySet читается
+    итератором, без загрузки всей страницы в память.
+    """
+    size = settings.STREAM_CHUNK_SIZE
+    if isinstance(posts, QuerySet):
+        posts = posts.iterator(chunk_size=size)
+    posts = iter(posts)
+    while True:
+        chunk = list(islice(posts, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,18 @@
+from django import template
+
+from .. import variants
+from ..models import Post
+
+register = template.Library()
+
+
+@register.simple_tag
+def card_thumbnails(posts):
+    """Готовит картинки карточек сразу для всех постов страницы:
+    в post.card_picture кладутся адаптивные варианты (см. variants)
+    или None, пока их нет. Хранилище не читается.
+    """
+    posts = [posts] if isinstance(posts, Post) else list(posts)
+    for post in posts:
+        post.card_picture = post.image and variants.picture(post)
+    return ''
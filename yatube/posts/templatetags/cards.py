@@ -0,0 +1,18 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from .. import cards, streaming
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts, view_button=False, edit_button=False):
+    """Карточки постов страницы из кэша карточек (см. cards);
+    при потоковом рендеринге - метка на их месте (см. streaming).
+    """
+    if context.get(streaming.CONTEXT_FLAG):
+        return mark_safe(streaming.marker(view_button, edit_button))
+    return mark_safe(cards.render(
+        posts, context.get('request'), view_button, edit_button
+    ))
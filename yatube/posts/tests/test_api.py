@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+@override_settings(POSTS_PER_PAGE=3)
+class ApiTest(TestCase):
+    """JSON API лент."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Запись в тестовую БД."""
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='anna')
+        cls.other = User.objects.create_user(username='boris')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Группа для проведения тестов.',
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.author,
+                group=cls.group if i % 2 else None,
+            )
+            for i in range(5)
+        ]
+        Post.objects.create(text='Чужой пост', author=cls.other)
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def get(self, name, params=None, **kwargs):
+        return self.guest_client.get(reverse(f'api:{name}', kwargs=kwargs),
+                                     params or {})
+
+    def collect(self, name, params=None, **kwargs):
+        """Все страницы ленты по курсорам."""
+        params = dict(params or {})
+        results = []
+        while True:
+            data = self.get(name, params, **kwargs).json()
+            results += data['results']
+            if not data['next_cursor']:
+                return results
+            params['cursor'] = data['next_cursor']
+
+    def test_feeds(self):
+        """Ленты листаются курсором и совпадают с HTML-лентами."""
+        feeds = (
+            ('posts', {}, Post.objects.all()),
+            ('group_posts', {'slug': self.group.slug},
+             self.group.posts.all()),
+            ('profile_posts', {'username': self.author.username},
+             self.author.posts.all()),
+        )
+        for name, kwargs, queryset in feeds:
+            with self.subTest(name=name):
+                results = self.collect(name, {'fields': 'id'}, **kwargs)
+                self.assertEqual(
+                    [item['id'] for item in results],
+                    list(queryset.order_by('-pub_date', '-id')
+                         .values_list('id', flat=True)),
+                )
+
+    def test_fields(self):
+        """?fields= оставляет только выбранные поля."""
+        data = self.get('posts', {'fields': 'text,author'}).json()
+        self.assertEqual(
+            data['results'][0], {'text': 'Чужой пост', 'author': 'boris'}
+        )
+        full = self.get('posts').json()['results'][0]
+        self.assertEqual(set(full), {
+            'id', 'text', 'pub_date', 'author', 'group', 'image',
+            'comment_count',
+        })
+
+    def test_ids(self):
+        """?ids= отдаёт посты в порядке запроса одним SQL-запросом."""
+        ids = [self.posts[3].id, self.posts[0].id, 10 ** 6]
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.get('posts', {
+                'ids': ','.join(map(str, ids)), 'fields': 'id,group',
+            })
+        self.assertEqual(response.json()['results'], [
+            {'id': self.posts[3].id, 'group': self.group.slug},
+            {'id': self.posts[0].id, 'group': None},
+        ])
+
+    def test_errors(self):
+        """Ошибки запроса отдаются в JSON."""
+        cases = (
+            ('posts', {'fields': 'password'}, {}, HTTPStatus.BAD_REQUEST),
+            ('posts', {'ids': 'x'}, {}, HTTPStatus.BAD_REQUEST),
+            ('posts', {'cursor': 'испорчен'}, {}, HTTPStatus.BAD_REQUEST),
+            ('group_posts', {}, {'slug': 'missing'}, HTTPStatus.NOT_FOUND),
+        )
+        for name, params, kwargs, status in cases:
+            with self.subTest(name=name, params=params):
+                response = self.get(name, params, **kwargs)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('error', response.json())
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from core import compression
+
+from .. import bench
+from ..models import Comment, FeedEntry, Follow, Group, Post, User
+
+
+class BenchTest(TestCase):
+    """Данные для замеров и сами замеры."""
+
+    def test_seed_bench(self):
+        """seed_bench создаёт данные с согласованными счётчиками
+        и лентами подписок.
+        """
+        call_command(
+            'seed_bench', posts=40, users=8, follows=20, stdout=StringIO()
+        )
+        self.assertEqual(User.objects.count(), 8)
+        self.assertEqual(Group.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 40)
+        self.assertEqual(Comment.objects.count(), 80)
+        self.assertEqual(Follow.objects.count(), 20)
+        author = User.objects.order_by('-stats__followers_count').first()
+        self.assertEqual(
+            author.stats.followers_count,
+            Follow.objects.filter(author=author).count(),
+        )
+        reader = User.objects.get(username='bench_0')
+        self.assertEqual(
+            FeedEntry.objects.filter(user=reader).count(),
+            Post.objects.filter(author__following__user=reader).count(),
+        )
+
+    def test_seed_bench_refuses_working_database(self):
+        """Рабочую базу seed_bench заполняет только с --force."""
+        with mock.patch.object(bench, 'is_test_database', return_value=False):
+            with self.assertRaises(CommandError):
+                call_command('seed_bench', posts=10, stdout=StringIO())
+            self.assertFalse(Post.objects.exists())
+            call_command(
+                'seed_bench', posts=10, force=True, stdout=StringIO()
+            )
+        self.assertEqual(Post.objects.count(), 10)
+        self.assertTrue(bench.is_test_database())
+
+    def test_measure(self):
+        """measure() возвращает перцентили, запросы и размер
+        для каждой страницы, клиента и состояния кэша.
+        """
+        bench.seed(**bench.sizes_for(30))
+        results = bench.measure(requests=3, pages=['index', 'follow_index'])
+        self.assertEqual(
+            [(row['page'], row['client'], row['cache']) for row in results],
+            [
+                ('index', 'guest', 'cold'), ('index', 'guest', 'warm'),
+                ('index', 'reader', 'cold'), ('index', 'reader', 'warm'),
+                ('follow_index', 'reader', 'cold'),
+                ('follow_index', 'reader', 'warm'),
+            ],
+        )
+        for row in results:
+            with self.subTest(row=row):
+                self.assertEqual(row['status'], HTTPStatus.OK)
+                self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+                # страница гостя из полностраничного кэша - без SQL
+                if (row['client'], row['cache']) != ('guest', 'warm'):
+                    self.assertGreater(row['queries'], 0)
+                self.assertGreater(row['bytes'], 0)
+
+    def test_measure_templates(self):
+        """measure_templates() сравнивает загрузчики шаблонов."""
+        bench.seed(**bench.sizes_for(30))
+        results = bench.measure_templates(requests=2)
+        self.assertEqual(
+            [(row['page'], row['loader']) for row in results],
+            [
+                ('index', 'debug'), ('profile', 'debug'),
+                ('index', 'cached'), ('profile', 'cached'),
+            ],
+        )
+        for row in results:
+            with self.subTest(row=row):
+                self.assertGreater(row['first_ms'], 0)
+                self.assertGreater(row['warm_ms'], 0)
+                self.assertGreater(row['p50_ms'], 0)
+
+    def test_measure_compression(self):
+        """measure_compression() сравнивает размер ответа без сжатия
+        и в доступных кодировках.
+        """
+        bench.seed(**bench.sizes_for(30))
+        results = bench.measure_compression(requests=2)
+        encodings = ('identity',) + compression.available()
+        self.assertEqual(
+            [(row['page'], row['encoding']) for row in results],
+            [(page, encoding) for page in ('index', 'post_view')
+             for encoding in encodings],
+        )
+        for row in results:
+            with self.subTest(row=row):
+                if row['encoding'] == 'identity':
+                    self.assertEqual(row['ratio'], 1)
+                else:
+                    self.assertLess(row['ratio'], 0.5)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(bench.percentile(values, 50), 50)
+        self.assertEqual(bench.percentile(values, 99), 99)
+        self.assertEqual(bench.percentile([7], 90), 7)
@@ -5,7 +5,8 @@ from django.core.cache.utils import make_template_fragment_key
 from django.test import Client, TestCase
 from django.urls import reverse
 
-from ..models import Group, Post, User
+from .. import versions
+from ..models import Comment, Follow, Group, Post, User
 
 
 class CacheTestCase(TestCase):
@@ -30,22 +31,115 @@ class CacheTestCase(TestCase):
     def setUp(self):
         """Неавторизованный пользователь"""
         self.guest_client = Client()
+        cache.clear()
 
     def test_cache_index(self):
+        """Главная страница отдаётся из кэша, пока
+        не изменится версия ленты.
+        """
         response_1 = self.guest_client.get(reverse('index'))
-        key = make_template_fragment_key('index_page', [1])
-        result = cache.get(key)
-        Post.objects.create(
-            text='Тест поста №2.',
-            author=self.author,
+        key = make_template_fragment_key(
+            'index_page', [1, versions.get(versions.index_key())]
         )
+        result = cache.get(key)
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигналов.')
         response_2 = self.guest_client.get(reverse('index'))
         self.assertIn('page', response_1.context)
         self.assertEqual(response_1.status_code, HTTPStatus.OK)
         self.assertEqual(response_2.status_code, HTTPStatus.OK)
         self.assertNotEqual(result, None)
         self.assertEqual(response_1.content, response_2.content)
-        cache.clear()
+        Post.objects.create(
+            text='Тест поста №2.',
+            author=self.author,
+        )
         response_3 = self.guest_client.get(reverse('index'))
         self.assertEqual(response_3.status_code, HTTPStatus.OK)
         self.assertNotEqual(response_1.content, response_3.content)
+        self.assertContains(response_3, 'Тест поста №2.')
+
+    def feed_versions(self, reader, other):
+        """Текущие версии лент по именам."""
+        return {
+            'index': versions.get(versions.index_key()),
+            'group': versions.get(versions.group_key(self.group.id)),
+            'other': versions.get(versions.group_key(other.id)),
+            'author': versions.get(versions.author_key(self.author.id)),
+            'follower': versions.follower_version(reader.id),
+        }
+
+    def test_versions_follow_changes(self):
+        """Изменения постов, комментариев и подписок
+        меняют версии только затронутых лент.
+        """
+        reader = User.objects.create_user(username='Galina')
+        other = Group.objects.create(
+            title='Другая группа', slug='other_slug', description='-'
+        )
+        before = self.feed_versions(reader, other)
+
+        def changed():
+            nonlocal before
+            after = self.feed_versions(reader, other)
+            result = {name for name in after if before[name] != after[name]}
+            before = after
+            return result
+
+        Follow.objects.create(user=reader, author=self.author)
+        self.assertEqual(changed(), {'follower', 'author'})
+        Comment.objects.create(post=self.post, author=reader, text='Ок')
+        self.assertEqual(changed(), set(before) - {'other'})
+        self.post.group = other
+        self.post.save()
+        self.assertEqual(changed(), set(before))
+
+    def test_renames_change_versions(self):
+        """Переименование сообщества или пользователя меняет версии
+        лент, где показывается имя; вход пользователя - нет.
+        """
+        reader = User.objects.create_user(username='Galina')
+        other = Group.objects.create(
+            title='Другая группа', slug='other_slug', description='-'
+        )
+        Follow.objects.create(user=reader, author=self.author)
+        Comment.objects.create(post=self.post, author=reader, text='Ок')
+        before = self.feed_versions(reader, other)
+
+        def changed():
+            nonlocal before
+            after = self.feed_versions(reader, other)
+            result = {name for name in after if before[name] != after[name]}
+            before = after
+            return result
+
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertEqual(changed(), set(before) - {'other'})
+        self.client.force_login(reader)
+        self.assertEqual(changed(), set())
+        reader.username = 'galina'
+        reader.save()
+        self.assertEqual(changed(), {'index', 'author', 'follower'})
+        self.author.first_name = 'Анна'
+        self.author.save()
+        self.assertEqual(changed(), set(before) - {'other'})
+
+    def test_cache_group_and_profile(self):
+        """Страницы сообщества и профиля кэшируются
+        и обновляются при публикации поста.
+        """
+        addresses = (
+            reverse('group_posts', kwargs={'slug': self.group.slug}),
+            reverse('profile', kwargs={'username': self.author.username}),
+        )
+        for address in addresses:
+            with self.subTest(address=address):
+                response_1 = self.guest_client.get(address)
+                Post.objects.filter(pk=self.post.pk).update(text='Обход.')
+                response_2 = self.guest_client.get(address)
+                self.assertEqual(response_1.content, response_2.content)
+                Post.objects.create(
+                    text='Новый пост.', author=self.author, group=self.group
+                )
+                response_3 = self.guest_client.get(address)
+                self.assertContains(response_3, 'Новый пост.')
@@ -0,0 +1,121 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from core import metrics
+
+from .. import cards
+from ..models import Comment, Group, Post, User
+
+
+class CardCacheTest(TestCase):
+    """Готовые карточки постов берутся из кэша."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Запись в тестовую БД."""
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='anna')
+        cls.reader = User.objects.create_user(username='Galina')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test_slug', description='Тест.'
+        )
+        for i in range(3):
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.author, group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def posts(self):
+        return list(Post.objects.for_feed())
+
+    def request(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+
+    def render(self, **kwargs):
+        """Карточки и число отрисованных шаблоном."""
+        template = cards.get_template(cards.TEMPLATE)
+        with mock.patch.object(
+            cards, 'get_template', return_value=template
+        ), mock.patch.object(
+            template, 'render', wraps=template.render
+        ) as render:
+            html = cards.render(self.posts(), **kwargs)
+        return html, render.call_count
+
+    def test_cards_rendered_once(self):
+        """Повторная страница собирается из кэша без шаблона."""
+        html, rendered = self.render()
+        self.assertEqual(rendered, 3)
+        self.assertEqual(self.render(), (html, 0))
+
+    def test_changes_render_only_changed_card(self):
+        """Правка поста и новый комментарий меняют только его карточку."""
+        self.render()
+        post = Post.objects.first()
+        post.text = 'Новый текст'
+        post.save()
+        html, rendered = self.render()
+        self.assertEqual(rendered, 1)
+        self.assertIn('Новый текст', html)
+        Comment.objects.create(post=post, author=self.reader, text='Ок')
+        html, rendered = self.render()
+        self.assertEqual(rendered, 1)
+        self.assertIn('Комментариев: 1', html)
+
+    def test_image_without_variants_not_cached(self):
+        """Карточка картинки без готовых вариантов не кэшируется,
+        с вариантами - кэшируется.
+        """
+        post = Post(pk=1, image='posts/photo.jpg')
+        self.assertFalse(cards.cacheable(post))
+        post.image_variants = json.dumps({
+            'image': 'posts/photo.jpg',
+            'sources': {'image/jpeg': [[480, 'posts/photo_480w.jpg']]},
+        })
+        self.assertTrue(cards.cacheable(post))
+        self.assertTrue(cards.cacheable(Post(pk=2)))
+
+    def test_buttons_depend_on_viewer(self):
+        """Кнопку редактирования видит только автор."""
+        for user, shown in ((self.author, True), (self.reader, False)):
+            with self.subTest(user=user):
+                html = cards.render(
+                    self.posts(), self.request(user), view_button=True,
+                    edit_button=True,
+                )
+                self.assertEqual('Редактировать' in html, shown)
+                self.assertIn('Просмотр', html)
+        self.assertNotIn('Просмотр', cards.render(self.posts()))
+
+    def test_feed_pages_use_cards(self):
+        """Ленты показывают карточки постов."""
+        client = Client()
+        addresses = (
+            reverse('index'),
+            reverse('group_posts', args=[self.group.slug]),
+            reverse('profile', args=[self.author.username]),
+        )
+        for address in addresses:
+            with self.subTest(address=address):
+                response = client.get(address)
+                for post in self.posts():
+                    self.assertContains(response, f'name="post_{post.id}"')
+
+    def test_card_render_time_not_counted_twice(self):
+        """Карточки рендерятся внутри шаблона страницы, и их время
+        входит в tpl страницы один раз.
+        """
+        with mock.patch.object(
+            metrics, 'add_template_time', wraps=metrics.add_template_time
+        ) as added:
+            response = Client().get(reverse('index'))
+        self.assertContains(response, 'Пост 2')
+        self.assertEqual(added.call_count, 1)
@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+
+
+@override_settings(COMMENTS_PER_PAGE=3)
+class CommentPagesTest(TestCase):
+    """Комментарии показываются и подгружаются порциями."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Запись в тестовую БД."""
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='anna')
+        cls.post = Post.objects.create(text='Тест поста.', author=cls.author)
+        for i in range(7):
+            Comment.objects.create(
+                post=cls.post, author=cls.author, text=f'Комментарий {i}'
+            )
+        cls.post_address = reverse('post', kwargs={
+            'username': cls.author.username, 'post_id': cls.post.id
+        })
+        cls.comments_address = reverse('post_comments', kwargs={
+            'username': cls.author.username, 'post_id': cls.post.id
+        })
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def texts(self, comments):
+        return [comment.text for comment in comments]
+
+    def test_post_page_shows_first_comments(self):
+        """На странице поста первые комментарии и курсор дальше."""
+        response = self.guest_client.get(self.post_address)
+        self.assertEqual(
+            self.texts(response.context['comments']),
+            ['Комментарий 0', 'Комментарий 1', 'Комментарий 2'],
+        )
+        self.assertIsNotNone(response.context['next_cursor'])
+        self.assertContains(response, 'js-more-comments')
+
+    def test_fragments_until_last_page(self):
+        """Фрагменты по курсору отдают остальные комментарии."""
+        cursor = self.guest_client.get(self.post_address).context[
+            'next_cursor'
+        ]
+        texts = []
+        while cursor:
+            response = self.guest_client.get(
+                self.comments_address, {'cursor': cursor}
+            )
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            self.assertNotContains(response, '<html')
+            texts += self.texts(response.context['comments'])
+            cursor = response.context['next_cursor']
+        self.assertEqual(
+            texts, [f'Комментарий {i}' for i in range(3, 7)]
+        )
+
+    def test_json(self):
+        """С ?format=json порция отдаётся в JSON."""
+        response = self.guest_client.get(
+            self.comments_address, {'format': 'json'}
+        )
+        data = response.json()
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']],
+            ['Комментарий 0', 'Комментарий 1', 'Комментарий 2'],
+        )
+        self.assertEqual(data['comments'][0]['author'], 'anna')
+        self.assertTrue(data['next_cursor'])
+
+    def test_invalid_cursor(self):
+        """Испорченный курсор даёт 404."""
+        response = self.guest_client.get(
+            self.comments_address, {'cursor': 'испорчен'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_drifted_counter(self):
+        """Продолжение не зависит от comment_count: счётчик выше
+        числа комментариев не роняет страницу, ниже - не прячет
+        следующую порцию.
+        """
+        empty = Post.objects.create(text='Без комментариев.',
+                                    author=self.author)
+        Post.objects.filter(pk=empty.pk).update(comment_count=5)
+        Post.objects.filter(pk=self.post.pk).update(comment_count=0)
+        for post, next_cursor in ((empty, False), (self.post, True)):
+            with self.subTest(post=post.text):
+                response = self.guest_client.get(
+                    reverse('post_comments', kwargs={
+                        'username': self.author.username, 'post_id': post.id
+                    }),
+                    {'format': 'json'},
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(
+                    response.json()['next_cursor'] is not None, next_cursor
+                )
@@ -0,0 +1,63 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Comment, Follow, Post, User, UserStats
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Запись в тестовую БД."""
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='anna')
+        cls.reader = User.objects.create_user(username='Galina')
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_follow_counters(self):
+        """Подписка и отписка меняют счётчики обоих пользователей."""
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        follow.delete()
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+
+    def test_post_and_comment_counters(self):
+        """Посты и комментарии учитываются в счётчиках."""
+        post = Post.objects.create(text='Текст поста.', author=self.author)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий'
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 0)
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+
+    def test_missing_stats_are_recreated(self):
+        """Если строки счётчиков нет, она создаётся пересчётом."""
+        Post.objects.create(text='Текст поста 1.', author=self.author)
+        UserStats.objects.filter(user=self.author).delete()
+        Post.objects.create(text='Текст поста 2.', author=self.author)
+        self.assertEqual(self.stats(self.author).posts_count, 2)
+
+    def test_recount_stats_fixes_drift(self):
+        """Команда recount_stats исправляет расхождения."""
+        post = Post.objects.create(text='Текст поста.', author=self.author)
+        Comment.objects.create(post=post, author=self.reader, text='Ок')
+        Follow.objects.create(user=self.reader, author=self.author)
+        UserStats.objects.update(followers_count=7, posts_count=0)
+        Post.objects.update(comment_count=5)
+        call_command('recount_stats', stdout=StringIO())
+        stats = self.stats(self.author)
+        self.assertEqual(stats.followers_count, 1)
+        self.assertEqual(stats.posts_count, 1)
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import feed, versions
+from ..models import FeedEntry, Follow, Post, User
+
+
+class FollowFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Запись в тестовую БД."""
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='anna')
+        cls.reader = User.objects.create_user(username='Galina')
+
+    def setUp(self):
+        """Авторизованный читатель."""
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def feed(self):
+        return list(
+            FeedEntry.objects.filter(user=self.reader)
+            .order_by('-pub_date', '-post_id')
+            .values_list('post_id', flat=True)
+        )
+
+    def follow_page(self):
+        response = self.authorized_client.get(reverse('follow_index'))
+        return [post.id for post in response.context['page']]
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост попадает в ленты подписчиков."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Текст поста.', author=self.author)
+        self.assertEqual(self.feed(), [post.id])
+        self.assertEqual(self.follow_page(), [post.id])
+
+    @override_settings(JOBS_EAGER=False)
+    def test_fan_out_bumps_follower_version(self):
+        """Раскладка в фоне меняет версию ленты подписчика после
+        вставки записей, а не только при сохранении поста.
+        """
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Текст поста.', author=self.author)
+        self.assertEqual(self.feed(), [])
+        saved = versions.follower_version(self.reader.id)
+        feed.fan_out(post.id)
+        self.assertEqual(self.feed(), [post.id])
+        self.assertNotEqual(
+            versions.follower_version(self.reader.id), saved
+        )
+
+    @override_settings(FEED_BACKFILL_SIZE=2)
+    def test_follow_backfills_and_unfollow_removes(self):
+        """Подписка добавляет последние посты автора,
+        отписка их убирает.
+        """
+        posts = [
+            Post.objects.create(text=f'Текст поста {i}.', author=self.author)
+            for i in range(3)
+        ]
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.feed(), [posts[2].id, posts[1].id])
+        follow.delete()
+        self.assertEqual(self.feed(), [])
+        self.assertEqual(self.follow_page(), [])
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_popular_author_posts_are_pulled(self):
+        """Посты автора с большим числом подписчиков
+        не раскладываются при публикации, а подтягиваются
+        при открытии ленты.
+        """
+        Follow.objects.create(user=self.reader, author=self.author)
+        first = Post.objects.create(text='Текст 1.', author=self.author)
+        second = Post.objects.create(text='Текст 2.', author=self.author)
+        self.assertEqual(self.feed(), [])
+        self.assertEqual(self.follow_page(), [second.id, first.id])
+        self.assertEqual(self.feed(), [second.id, first.id])
+        third = Post.objects.create(text='Текст 3.', author=self.author)
+        self.assertEqual(
+            self.follow_page(), [third.id, second.id, first.id]
+        )
+
+    @override_settings(FEED_FANOUT_LIMIT=1, FEED_BACKFILL_SIZE=2)
+    def test_pull_is_not_capped_between_visits(self):
+        """Посты, опубликованные между визитами, подтягиваются
+        все, даже если их больше FEED_BACKFILL_SIZE.
+        """
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(text='Текст 0.', author=self.author)
+        feed.pull(self.reader)
+        posts = [
+            Post.objects.create(text=f'Текст {i}.', author=self.author)
+            for i in range(1, 6)
+        ]
+        with mock.patch.object(feed, 'BATCH_SIZE', 2):
+            self.assertEqual(feed.pull(self.reader), 5)
+        self.assertEqual(self.feed()[:5], [post.id for post in posts[::-1]])
+        self.assertEqual(feed.pull(self.reader), 0)
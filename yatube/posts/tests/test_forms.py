@@ -1,13 +1,16 @@
 import shutil
 import tempfile
 from http import HTTPStatus
+from io import BytesIO
 
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase
 from django.test.utils import override_settings
 from django.urls import reverse
+from PIL import Image
 
+from ..forms import PostForm
 from ..models import Group, Post, User
 
 
@@ -76,7 +79,7 @@ class PostCreateFormTests(TestCase):
             Post.objects.filter(
                 text=form_data['text'],
                 group=form_data['group'],
-                image=f'posts/{uploaded.name}'
+                image='posts/small.jpg'
             ).exists()
         )
 
@@ -113,6 +116,85 @@ class PostCreateFormTests(TestCase):
             Post.objects.filter(
                 text=form_data['text'],
                 group=form_data['group'],
-                image=f'posts/{uploaded.name}'
+                image='posts/small2.jpg'
             ).exists()
         )
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR))
+class ImageUploadTests(TestCase):
+    """Загруженные картинки ограничиваются и перекодируются."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='anna')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    @staticmethod
+    def image_file(name, mode='RGB', size=(50, 50), fmt='JPEG', **kwargs):
+        buffer = BytesIO()
+        Image.new(mode, size, 'red').save(buffer, fmt, **kwargs)
+        return SimpleUploadedFile(name, buffer.getvalue())
+
+    def post_image(self, image):
+        return self.authorized_client.post(
+            reverse('new_post'), {'text': 'Картинка.', 'image': image}
+        )
+
+    @override_settings(UPLOAD_IMAGE_MAX_SIDE=100)
+    def test_image_downscaled_and_stripped(self):
+        """Картинка уменьшается, перекодируется в JPEG без EXIF."""
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        self.post_image(self.image_file(
+            'photo.png', size=(400, 200), fmt='PNG', exif=exif
+        ))
+        post = Post.objects.get()
+        self.assertEqual(post.image.name, 'posts/photo.jpg')
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.size, (100, 50))
+            self.assertNotIn('exif', image.info)
+
+    def test_transparent_image_kept_png(self):
+        """Картинка с прозрачностью остаётся PNG."""
+        self.post_image(self.image_file('logo.png', 'RGBA', fmt='PNG'))
+        with Image.open(Post.objects.get().image.path) as image:
+            self.assertEqual(image.format, 'PNG')
+            self.assertEqual(image.mode, 'RGBA')
+
+    def test_limits(self):
+        """Слишком большой файл или слишком много пикселей
+        дают ошибку формы, пост не создаётся.
+        """
+        cases = (
+            ({'UPLOAD_MAX_BYTES': 100}, 'file_too_large'),
+            ({'UPLOAD_MAX_PIXELS': 100}, 'too_many_pixels'),
+        )
+        for limits, code in cases:
+            with self.subTest(code=code), override_settings(**limits):
+                response = self.post_image(
+                    self.image_file('big.jpg', size=(20, 20))
+                )
+                form = response.context['form']
+                self.assertTrue(form.has_error('image', code))
+                self.assertFalse(Post.objects.exists())
+
+    def test_truncated_image_is_form_error(self):
+        """Обрезанный JPEG проходит проверку заголовка, но не
+        декодируется: форма невалидна, а не падает.
+        """
+        data = self.image_file('cut.jpg', size=(200, 200)).read()
+        image = SimpleUploadedFile('cut.jpg', data[:len(data) // 2])
+        form = PostForm({'text': 'Картинка.'}, {'image': image})
+        self.assertFalse(form.is_valid())
+        self.assertTrue(form.has_error('image', 'invalid_image'))
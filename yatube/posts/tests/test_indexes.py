@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+from ..paginator import CursorPaginator
+
+
+class FeedIndexesTest(TestCase):
+    """Запросы лент идут по индексам, а не полным сканированием."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Запись в тестовую БД."""
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='anna')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Группа для проведения тестов.',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for i in range(15):
+            Post.objects.create(
+                text=f'Текст поста {i}.', author=cls.author, group=cls.group
+            )
+
+    def setUp(self):
+        """Авторизованный подписчик автора."""
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+        cache.clear()
+
+    def feed_query(self, address):
+        """SQL запроса страницы ленты."""
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(address)
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if (sql.startswith('SELECT "posts_post"."id"')
+                    and 'ORDER BY' in sql and 'LIMIT' in sql):
+                return sql
+        self.fail(f'Не найден запрос ленты {address}')
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+                return '\n'.join(row[0] for row in cursor.fetchall())
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return '\n'.join(row[-1] for row in cursor.fetchall())
+
+    def test_feed_queries_use_indexes(self):
+        """Главная, сообщество, профиль и подписки
+        читают посты по индексу, в том числе по курсору.
+        """
+        posts = Post.objects.order_by('-pub_date', '-id')
+        cursor = CursorPaginator(posts).encode(posts[4])
+        feeds = {
+            reverse('index'): 'post_pub_date_idx',
+            reverse('index') + '?page=2': 'post_pub_date_idx',
+            reverse('index') + f'?cursor={cursor}': 'post_pub_date_idx',
+            reverse('group_posts', kwargs={'slug': self.group.slug}):
+                'post_group_pub_date_idx',
+            reverse('profile', kwargs={'username': self.author.username}):
+                'post_author_pub_date_idx',
+            reverse('follow_index'): 'feed_user_pub_date_idx',
+        }
+        for address, index in feeds.items():
+            with self.subTest(address=address):
+                plan = self.explain(self.feed_query(address))
+                self.assertIn(index, plan)
+                if connection.vendor == 'sqlite':
+                    self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_comments_query_uses_index(self):
+        """Комментарии поста читаются по индексу (post, created)."""
+        post = Post.objects.first()
+        for i in range(3):
+            Comment.objects.create(post=post, author=self.reader, text='Ок')
+        address = reverse('post_comments', kwargs={
+            'username': self.author.username, 'post_id': post.id
+        })
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(address)
+        sql = next(
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT "posts_comment"."id"')
+        )
+        plan = self.explain(sql)
+        self.assertIn('comment_post_created_idx', plan)
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', plan)
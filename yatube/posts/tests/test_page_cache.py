@@ -0,0 +1,134 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Group, Post, User
+
+
+class AnonymousPageCacheTest(TestCase):
+    """Полностраничный кэш и условные запросы для гостей."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Запись в тестовую БД."""
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='anna')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Группа для проведения тестов.',
+        )
+        cls.post = Post.objects.create(
+            text='Тест поста тут.', author=cls.author, group=cls.group,
+        )
+        cls.addresses = (
+            reverse('index'),
+            reverse('group_posts', kwargs={'slug': cls.group.slug}),
+            reverse('profile', kwargs={'username': cls.author.username}),
+            reverse('post', kwargs={
+                'username': cls.author.username, 'post_id': cls.post.id
+            }),
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        cache.clear()
+
+    def test_conditional_get(self):
+        """Совпавший ETag даёт 304; Last-Modified не ставится,
+        и If-Modified-Since не даёт 304.
+        """
+        for address in self.addresses:
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertIn('ETag', response)
+                self.assertNotIn('Last-Modified', response)
+                response_etag = self.guest_client.get(
+                    address, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                response_date = self.guest_client.get(
+                    address,
+                    HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 2099 00:00:00 GMT',
+                )
+                self.assertEqual(
+                    response_etag.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                self.assertEqual(response_date.status_code, HTTPStatus.OK)
+
+    def test_edit_changes_page(self):
+        """Правка поста без новых записей меняет ETag страниц,
+        где он показан.
+        """
+        etags = {
+            address: self.guest_client.get(address)['ETag']
+            for address in self.addresses
+        }
+        self.post.text = 'Исправленный текст.'
+        self.post.save()
+        for address, etag in etags.items():
+            with self.subTest(address=address):
+                response = self.guest_client.get(
+                    address, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertContains(response, 'Исправленный текст.')
+
+    def test_page_served_from_cache(self):
+        """Повторный запрос гостя не обращается к представлению."""
+        for address in self.addresses:
+            with self.subTest(address=address):
+                first = self.guest_client.get(address)
+                with CaptureQueriesContext(connection) as queries:
+                    second = self.guest_client.get(address)
+                self.assertLessEqual(len(queries), 2)
+                self.assertIsNone(second.context)
+                self.assertEqual(first.content, second.content)
+
+    def test_unused_params_share_entry(self):
+        """Параметры, которые представления не читают, не создают
+        новых записей кэша; page и q - создают.
+        """
+        cache.clear()
+        index = reverse('index')
+        first = self.guest_client.get(index, {'utm': 1})
+        second = self.guest_client.get(index, {'utm': 2, 'x': 1})
+        self.assertIsNotNone(first.context)
+        self.assertIsNone(second.context)
+        self.assertEqual(first['ETag'], second['ETag'])
+        paged = self.guest_client.get(index, {'page': 1, 'utm': 1})
+        self.assertNotEqual(paged['ETag'], first['ETag'])
+
+    def test_authorized_bypass_cache(self):
+        """Авторизованный пользователь получает страницу без ETag."""
+        for address in self.addresses:
+            with self.subTest(address=address):
+                response = self.authorized_client.get(address)
+                self.assertNotIn('ETag', response)
+                self.assertIsNotNone(response.context)
+
+    def test_changes_invalidate_page(self):
+        """Новый пост и комментарий меняют ETag страницы."""
+        post_address = self.addresses[3]
+        index_etag = self.guest_client.get(self.addresses[0])['ETag']
+        post_etag = self.guest_client.get(post_address)['ETag']
+        Post.objects.create(text='Новый пост.', author=self.author)
+        response = self.guest_client.get(
+            self.addresses[0], HTTP_IF_NONE_MATCH=index_etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Новый пост.')
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Свежий комментарий'
+        )
+        response = self.guest_client.get(
+            post_address, HTTP_IF_NONE_MATCH=post_etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Свежий комментарий')
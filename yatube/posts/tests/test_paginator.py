@@ -1,8 +1,9 @@
 from django.core.cache import cache
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from ..models import Group, Post, User
+from ..paginator import CursorPaginator
 
 
 class PaginatorViewsTest(TestCase):
@@ -50,3 +51,73 @@ class PaginatorViewsTest(TestCase):
                 self.assertEqual(len(
                     response.context.get('page').object_list), 3
                 )
+
+
+@override_settings(POSTS_PER_PAGE=5, PAGINATOR_MAX_PAGES=2)
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Запись в тестовую БД."""
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='anna')
+        for i in range(23):
+            Post.objects.create(text=f'Текст поста {i}.', author=cls.user)
+        cls.expected = list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_numbered_pages_are_bounded(self):
+        """Номерные страницы ограничены, с последней
+        можно перейти дальше по курсору.
+        """
+        paginator = CursorPaginator(Post.objects.all())
+        self.assertEqual(paginator.count, 10)
+        self.assertEqual(paginator.num_pages, 2)
+        self.assertTrue(paginator.truncated)
+        page = paginator.get_page(2)
+        self.assertFalse(page.has_next())
+        self.assertIsNotNone(page.next_cursor)
+        self.assertIsNone(paginator.get_page(1).next_cursor)
+
+    def test_cursor_walks_whole_feed(self):
+        """По курсорам лента проходится целиком
+        без пропусков и повторов, в обе стороны.
+        """
+        paginator = CursorPaginator(Post.objects.all())
+        page = paginator.get_page(2)
+        seen = [post.id for post in paginator.get_page(1)]
+        seen += [post.id for post in page]
+        pages = []
+        while page.next_cursor:
+            page = paginator.get_cursor_page(page.next_cursor)
+            pages.append(page)
+            seen += [post.id for post in page]
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages[-1]), 3)
+        previous = paginator.get_cursor_page(pages[-1].previous_cursor)
+        self.assertEqual(
+            [post.id for post in previous],
+            [post.id for post in pages[-2]]
+        )
+
+    def test_feed_view_accepts_cursor(self):
+        """Страница ленты открывается по курсору из ссылки."""
+        response = self.client.get(reverse('index') + '?page=2')
+        cursor = response.context['page'].next_cursor
+        self.assertContains(response, f'?cursor={cursor}')
+        response = self.client.get(reverse('index') + f'?cursor={cursor}')
+        page = response.context['page']
+        self.assertEqual(page.cursor, cursor)
+        self.assertEqual(
+            [post.id for post in page], self.expected[10:15]
+        )
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        """Испорченный курсор открывает первую страницу."""
+        response = self.client.get(reverse('index') + '?cursor=broken')
+        self.assertEqual(response.context['page'].number, 1)
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class FeedQueriesTest(TestCase):
+    """Число запросов страниц ленты не зависит
+    от количества постов на странице.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Запись в тестовую БД."""
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='anna')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Группа для проведения тестов.',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        """Авторизованный подписчик автора."""
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def add_posts(self, count):
+        for i in range(count):
+            author = User.objects.create_user(username=f'user_{count}_{i}')
+            post = Post.objects.create(
+                text=f'Текст поста {i}.', author=self.author,
+                group=self.group,
+            )
+            Comment.objects.create(post=post, author=author, text='Ок')
+
+    def test_feed_pages_use_constant_number_of_queries(self):
+        """Главная, сообщество, профиль и подписки
+        укладываются в фиксированное число запросов.
+        """
+        pages = (
+            (reverse('index'), 4),
+            (reverse('group_posts', kwargs={'slug': self.group.slug}), 5),
+            (reverse('profile', kwargs={'username': self.author.username}),
+             6),
+            (reverse('follow_index'), 6),
+        )
+        for posts_count in (1, 9):
+            self.add_posts(posts_count)
+            for address, queries in pages:
+                with self.subTest(address=address, posts=posts_count):
+                    cache.clear()
+                    with self.assertNumQueries(queries):
+                        self.authorized_client.get(address)
+
+    def test_post_page_comments(self):
+        """Авторы комментариев загружаются вместе с комментариями."""
+        self.add_posts(1)
+        post = Post.objects.get()
+        for i in range(9):
+            author = User.objects.create_user(username=f'commenter_{i}')
+            Comment.objects.create(post=post, author=author, text='Ок')
+        address = reverse('post', kwargs={
+            'username': self.author.username, 'post_id': post.id
+        })
+        with self.assertNumQueries(5):
+            self.authorized_client.get(address)
@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import search
+from ..models import Post, User
+
+
+@override_settings(POSTS_PER_PAGE=2)
+class SearchTest(TestCase):
+    """Полнотекстовый поиск по постам."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Запись в тестовую БД."""
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='anna')
+        cls.exact = Post.objects.create(
+            text='Горы, горы и ещё раз горы.', author=cls.author
+        )
+        cls.once = Post.objects.create(
+            text='Поход в горы с палаткой и долгим подъёмом на перевал.',
+            author=cls.author,
+        )
+        cls.prefix = Post.objects.create(
+            text='Горный хребет в тумане.', author=cls.author
+        )
+        Post.objects.create(text='Море и песок.', author=cls.author)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def found(self, query):
+        return list(search.search(query).order_by('-rank', '-id'))
+
+    def test_ranked(self):
+        """Посты ранжируются, слова ищутся по началу."""
+        self.assertEqual(self.found('горы'), [self.exact, self.once])
+        found = self.found('гор')
+        self.assertEqual(found[0], self.exact)
+        self.assertCountEqual(found, [self.exact, self.once, self.prefix])
+        self.assertEqual(self.found('"горы" OR NOT'), [])
+        self.assertEqual(self.found('  '), [])
+
+    def test_index_follows_posts(self):
+        """Индекс обновляется при правке и удалении поста."""
+        post = Post.objects.get(pk=self.once.pk)
+        post.text = 'Поход к морю.'
+        post.save()
+        self.assertEqual(self.found('поход'), [post])
+        self.assertEqual(self.found('горы'), [self.exact])
+        Post.objects.get(pk=self.exact.pk).delete()
+        self.assertEqual(self.found('горы'), [])
+
+    def test_rebuild(self):
+        """Команда rebuild_search заполняет индекс заново."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.TABLE}')
+        self.assertEqual(self.found('море'), [])
+        call_command('rebuild_search', stdout=StringIO())
+        self.assertEqual(len(self.found('море')), 1)
+
+    def test_search_page(self):
+        """Страница поиска листается курсором."""
+        response = self.guest_client.get(reverse('search'), {'q': 'гор'})
+        first = list(response.context['page'])
+        cursor = response.context['page'].next_cursor
+        self.assertIsNotNone(cursor)
+        response = self.guest_client.get(
+            reverse('search'), {'q': 'гор', 'cursor': cursor}
+        )
+        self.assertIsNone(response.context['page'].next_cursor)
+        self.assertEqual(
+            first + list(response.context['page']), self.found('гор')
+        )
@@ -0,0 +1,121 @@
+import re
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from core.queries import RepeatedQueryError
+
+from .. import streaming
+from ..models import Follow, Group, Post, User
+
+
+@override_settings(STREAM_CHUNK_SIZE=2)
+class StreamingFeedTest(TestCase):
+    """Потоковая отдача страниц ленты."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Запись в тестовую БД."""
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='anna')
+        cls.reader = User.objects.create_user(username='Galina')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test_slug', description='Тест.'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for i in range(5):
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.author, group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def pages(self):
+        return (
+            (self.reader_client, reverse('index')),
+            (self.reader_client, reverse('group_posts', args=['test_slug'])),
+            (self.reader_client, reverse('follow_index')),
+            (self.reader_client, reverse('profile', args=['anna'])),
+            (self.author_client, reverse('profile', args=['anna'])),
+        )
+
+    def stream(self, client, address):
+        response = client.get(address)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_streamed_page_matches_rendered(self):
+        """Поток собирается в ту же страницу, что и обычный рендеринг,
+        в том числе из фрагмента кэша, сохранённого другим режимом.
+        """
+        for client, address in self.pages():
+            with self.subTest(address=address):
+                cache.clear()
+                rendered = client.get(address).content
+                with override_settings(STREAM_FEEDS=True):
+                    cached = self.stream(client, address)
+                    cache.clear()
+                    streamed = self.stream(client, address)
+                self.assertEqual(cached, rendered)
+                self.assertEqual(streamed, rendered)
+                self.assertEqual(client.get(address).content, rendered)
+
+    @override_settings(STREAM_FEEDS=True)
+    def test_head_sent_before_cards(self):
+        """Первой частью уходит начало страницы без постов,
+        затем карточки порциями по STREAM_CHUNK_SIZE.
+        """
+        response = self.reader_client.get(reverse('index'))
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertIn('<nav', chunks[0])
+        self.assertNotIn('Пост', chunks[0])
+        self.assertEqual(len(chunks), 2 + 3)
+        self.assertEqual(
+            [chunk.count('Пост') for chunk in chunks[1:-1]], [2, 2, 1]
+        )
+        self.assertIn('</html>', chunks[-1])
+
+    @override_settings(STREAM_FEEDS=True)
+    def test_guests_get_whole_page(self):
+        """Страницы гостей не потоковые: их хранит кэш страниц."""
+        response = Client().get(reverse('index'))
+        self.assertFalse(response.streaming)
+        self.assertContains(response, 'Пост 4')
+
+    @override_settings(STREAM_FEEDS=True)
+    def test_body_is_measured(self):
+        """SQL тела потока попадает в метрики запроса,
+        Server-Timing показывает работу до первого байта.
+        """
+        metrics.reset()
+        response = self.reader_client.get(reverse('index'))
+        content = b''.join(response.streaming_content)
+        header = int(re.search(
+            r'desc="(\d+) queries"', response['Server-Timing']
+        ).group(1))
+        recorded = metrics.snapshot()['index']
+        self.assertGreater(recorded['queries']['max'], header)
+        self.assertEqual(recorded['bytes']['max'], len(content))
+
+    @override_settings(
+        STREAM_FEEDS=True, QUERY_REPEAT_LIMIT=2, QUERY_REPEAT_ACTION='raise'
+    )
+    def test_body_is_checked_for_repeated_queries(self):
+        """N+1 в теле потока находится, как и в обычном ответе."""
+        def render(posts, *args):
+            for post in posts:
+                User.objects.filter(pk=post.author_id).exists()
+            return ''
+
+        response = self.reader_client.get(reverse('index'))
+        with mock.patch.object(streaming.cards, 'render', render):
+            with self.assertRaises(RepeatedQueryError):
+                b''.join(response.streaming_content)
@@ -0,0 +1,166 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .. import thumbnails, variants
+from ..models import Post, User
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR))
+class ThumbnailsTest(TestCase):
+    """Миниатюры создаются вне рендеринга страниц."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Временная папка для медиа-файлов.
+        Запись в тестовую БД.
+        """
+        super().setUpClass()
+        cls.small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        cls.author = User.objects.create_user(username='anna')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        cache.clear()
+
+    def create_post(self, name='small.gif', content=None):
+        return Post.objects.create(
+            text='Пост с картинкой.', author=self.author,
+            image=SimpleUploadedFile(name, content or self.small_gif),
+        )
+
+    def test_page_shows_placeholder_until_generated(self):
+        """До создания вариантов в карточке заглушка, после -
+        <picture> с srcset, без генерации при рендеринге.
+        """
+        post = self.create_post()
+        with mock.patch.object(variants, 'generate') as generate:
+            response = self.authorized_client.get(reverse('index'))
+        generate.assert_not_called()
+        self.assertContains(response, 'data:image/svg+xml')
+        self.assertTrue(thumbnails.generate(post.pk))
+        response = self.authorized_client.get(reverse('index'))
+        self.assertContains(response, '<picture>')
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, '/media/posts/small_480w.jpg 480w')
+        self.assertNotContains(response, 'data:image/svg+xml')
+
+    @override_settings(IMAGE_VARIANT_WIDTHS=(480, 960, 1440))
+    def test_variants(self):
+        """Варианты создаются рядом с оригиналом без увеличения
+        и перестают действовать после замены картинки.
+        """
+        buffer = BytesIO()
+        Image.new('RGB', (1000, 600), 'red').save(buffer, 'JPEG')
+        post = self.create_post('wide.jpg', buffer.getvalue())
+        thumbnails.generate(post.pk)
+        post.refresh_from_db()
+        sources = variants.load(post)
+        self.assertEqual(
+            sorted(sources), ['image/jpeg', 'image/webp']
+        )
+        self.assertEqual(
+            sources['image/webp'],
+            [[480, 'posts/wide_480w.webp'], [960, 'posts/wide_960w.webp']],
+        )
+        with Image.open(default_storage.path('posts/wide_960w.jpg')) as im:
+            self.assertEqual(im.size, (960, 339))
+        post.image = 'posts/other.jpg'
+        self.assertEqual(variants.load(post), {})
+
+    def test_formats_in_fresh_process(self):
+        """В новом процессе, где Pillow знает только плагины
+        preinit(), форматы те же: остальные плагины регистрируются.
+        """
+        code = (
+            'from django.conf import settings\n'
+            'settings.configure(IMAGE_VARIANT_FORMATS=%r)\n'
+            'from PIL import Image\n'
+            'Image.preinit()\n'
+            'from posts import variants\n'
+            'print(",".join(variants.formats()))\n'
+            % (settings.IMAGE_VARIANT_FORMATS,)
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        )
+        Image.init()
+        self.assertEqual(
+            result.stdout.strip().split(','),
+            [fmt for fmt in settings.IMAGE_VARIANT_FORMATS
+             if fmt in Image.SAVE],
+        )
+
+    def test_delete_post_deletes_variants(self):
+        """Файлы вариантов удаляются вместе с постом."""
+        post = self.create_post('gone.gif')
+        thumbnails.generate(post.pk)
+        post.refresh_from_db()
+        names = variants.names(post)
+        self.assertTrue(names)
+        post.delete()
+        for name in names:
+            with self.subTest(name=name):
+                self.assertFalse(default_storage.exists(name))
+
+    def test_backfill_command(self):
+        """Команда создаёт варианты только для постов без них."""
+        posts = [self.create_post(f'old_{i}.gif') for i in range(2)]
+        thumbnails.generate(posts[0].pk)
+        out = StringIO()
+        call_command('image_variants', workers=0, stdout=out)
+        self.assertIn('1 из 1', out.getvalue())
+        posts[1].refresh_from_db()
+        self.assertTrue(variants.load(posts[1]))
+
+    def test_forms_schedule_thumbnails(self):
+        """Создание поста и замена картинки ставят миниатюру
+        в очередь, правка без картинки - нет.
+        """
+        with mock.patch.object(thumbnails, 'schedule') as schedule:
+            self.authorized_client.post(reverse('new_post'), {
+                'text': 'Новый пост.',
+                'image': SimpleUploadedFile(
+                    'new.gif', self.small_gif, 'image/gif'
+                ),
+            })
+            post = Post.objects.get(text='Новый пост.')
+            edit_address = reverse('post_edit', kwargs={
+                'username': self.author.username, 'post_id': post.id
+            })
+            self.authorized_client.post(edit_address, {'text': 'Правка.'})
+            self.assertEqual(schedule.call_count, 1)
+            self.authorized_client.post(edit_address, {
+                'text': 'Правка.',
+                'image': SimpleUploadedFile(
+                    'other.gif', self.small_gif, 'image/gif'
+                ),
+            })
+        self.assertEqual(schedule.call_count, 2)
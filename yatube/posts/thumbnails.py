@@ -0,0 +1,64 @@
+"""Картинки карточек постов вне запроса.
+
+После сохранения поста с картинкой фоновая задача создаёт
+адаптивные варианты (см. variants). Шаблоны ничего не генерируют:
+пока вариантов нет, в карточке заглушка. Для постов, созданных
+до вариантов, их создаёт manage.py image_variants.
+"""
+import logging
+
+from django.db import connection
+
+from core import jobs
+
+from . import variants, versions
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+def generate(post_id):
+    """Создаёт варианты картинки поста и сбрасывает версии его лент.
+
+    Возвращает True, если варианты сохранены.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return False
+    image_variants = variants.generate(post)
+    updated = Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        image_variants=image_variants
+    )
+    if not updated:
+        variants.delete(Post(image_variants=image_variants))
+        return False
+    variants.delete(post)
+    versions.bump(*versions.post_keys(post))
+    return True
+
+
+def _run(post_id):
+    try:
+        return generate(post_id)
+    except Exception:
+        logger.exception('Не удалось создать картинки поста %s', post_id)
+        return False
+
+
+def work(post_id):
+    """generate() для фонового потока или процесса: ошибки
+    пишутся в лог, соединение с базой закрывается.
+    """
+    try:
+        return _run(post_id)
+    finally:
+        connection.close()
+
+
+def schedule(post):
+    """Ставит создание вариантов картинки в очередь задач
+    после коммита (см. core.jobs).
+    """
+    if not post.image:
+        return
+    jobs.defer(generate, post.pk, key=f'thumbnails:{post.pk}:{post.image}')
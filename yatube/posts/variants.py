@@ -0,0 +1,141 @@
+"""Адаптивные варианты картинок карточек.
+
+Для Post.image создаются кадры карточки нескольких ширин
+(IMAGE_VARIANT_WIDTHS) в форматах IMAGE_VARIANT_FORMATS и
+сохраняются рядом с оригиналом: posts/photo.jpg ->
+posts/photo_480w.webp. Форматы, которые не умеет записывать
+установленный Pillow, пропускаются; AVIF доступен с пакетом
+pillow-avif-plugin.
+"""
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+try:
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+CARD_RATIO = 339 / 960
+
+MIME_TYPES = {
+    'AVIF': 'image/avif',
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+}
+EXTENSIONS = {'AVIF': 'avif', 'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def formats():
+    """Форматы вариантов, которые может записать Pillow.
+
+    Image.init() регистрирует все плагины: в новом процессе,
+    открывшем только JPEG, WEBP в Image.SAVE ещё нет.
+    """
+    Image.init()
+    return [fmt for fmt in settings.IMAGE_VARIANT_FORMATS if fmt in Image.SAVE]
+
+
+def widths(source_width):
+    """Ширины вариантов без увеличения; самая узкая есть всегда."""
+    allowed = sorted(settings.IMAGE_VARIANT_WIDTHS)
+    return [w for w in allowed if w <= source_width] or allowed[:1]
+
+
+def load(post):
+    """Сохранённые варианты картинки поста.
+
+    Возвращает {mime: [[ширина, имя файла], ...]} или {}, если
+    вариантов нет или они построены для другой картинки.
+    """
+    try:
+        data = json.loads(post.image_variants)
+    except (TypeError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('image') != post.image.name:
+        return {}
+    return data.get('sources') or {}
+
+
+def names(post):
+    """Имена файлов вариантов, записанных в посте."""
+    try:
+        sources = json.loads(post.image_variants)['sources']
+    except (TypeError, ValueError, KeyError):
+        return []
+    return [
+        name for variants in sources.values() for _width, name in variants
+    ]
+
+
+def delete_files(*names):
+    for name in names:
+        default_storage.delete(name)
+
+
+def delete(post):
+    """Удаляет файлы вариантов, записанные в посте."""
+    delete_files(*names(post))
+
+
+def generate(post):
+    """Создаёт варианты картинки поста и возвращает их описание
+    для Post.image_variants.
+    """
+    stem = os.path.splitext(post.image.name)[0]
+    sources = {}
+    post.image.open('rb')
+    try:
+        with Image.open(post.image) as source:
+            source.draft('RGB', (max(settings.IMAGE_VARIANT_WIDTHS),) * 2)
+            image = ImageOps.exif_transpose(source).convert('RGB')
+    finally:
+        post.image.close()
+    for width in widths(image.width):
+        size = (width, round(width * CARD_RATIO))
+        frame = ImageOps.fit(image, size, Image.LANCZOS)
+        for fmt in formats():
+            name = _save(frame, f'{stem}_{width}w.{EXTENSIONS[fmt]}', fmt)
+            sources.setdefault(MIME_TYPES[fmt], []).append([width, name])
+    return json.dumps({'image': post.image.name, 'sources': sources})
+
+
+def _save(image, name, fmt):
+    with tempfile.TemporaryFile() as output:
+        image.save(
+            output, fmt, quality=settings.IMAGE_VARIANT_QUALITY,
+            optimize=fmt == 'JPEG', progressive=fmt == 'JPEG',
+        )
+        output.seek(0)
+        return default_storage.save(name, File(output))
+
+
+def picture(post):
+    """Данные для <picture> карточки или None, если вариантов нет."""
+    sources = load(post)
+    if not sources:
+        return None
+    srcsets = [
+        (mime, ', '.join(
+            f'{default_storage.url(name)} {width}w'
+            for width, name in variants
+        ))
+        for mime, variants in sources.items()
+    ]
+    fallback = sources.get('image/jpeg') or next(iter(sources.values()))
+    width, name = fallback[-1]
+    return {
+        'sources': [
+            {'type': mime, 'srcset': srcset}
+            for mime, srcset in srcsets if mime != 'image/jpeg'
+        ],
+        'srcset': dict(srcsets).get('image/jpeg', srcsets[-1][1]),
+        'src': default_storage.url(name),
+        'width': width,
+        'height': round(width * CARD_RATIO),
+    }
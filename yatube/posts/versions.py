@@ -0,0 +1,113 @@
+"""Версии кэшируемых лент.
+
+Версия ленты входит в ключ её фрагментов кэша. Сигналы Post,
+Comment, Follow, Group и User меняют версии затронутых лент, и
+старые фрагменты перестают читаться сразу, а не по истечении
+таймаута. Версия ленты подписок не хранится отдельно для каждого
+поста: она выводится из версии самого читателя и версий авторов,
+на которых он подписан, поэтому пост меняет один ключ автора,
+а не ключи всех его подписчиков.
+Версия - случайный токен, а не счётчик: если ключ версии вытеснен
+из кэша, новая версия не совпадёт ни с одной из прежних.
+"""
+import hashlib
+import uuid
+
+from django.core.cache import cache
+
+PREFIX = 'feed-version'
+
+
+def index_key():
+    return f'{PREFIX}:index'
+
+
+def group_key(group_id):
+    return f'{PREFIX}:group:{group_id}'
+
+
+def author_key(author_id):
+    return f'{PREFIX}:author:{author_id}'
+
+
+def follower_key(user_id):
+    return f'{PREFIX}:follower:{user_id}'
+
+
+def get(key):
+    """Возвращает текущую версию ленты, создавая её при отсутствии."""
+    return get_many([key])[key]
+
+
+def get_many(keys):
+    """Версии лент одним обращением к кэшу; отсутствующие создаются."""
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            version = uuid.uuid4().hex
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+            found[key] = version
+    return found
+
+
+def bump(*keys):
+    """Меняет версии лент одним обращением к кэшу."""
+    if keys:
+        cache.set_many(
+            {key: uuid.uuid4().hex for key in keys}, timeout=None
+        )
+
+
+def follower_version(user_id):
+    """Версия ленты подписок: меняется вместе с версией читателя
+    (подписка, отписка, подтягивание постов) и версией любого
+    автора, на которого он подписан.
+    """
+    from .models import Follow
+    authors = Follow.objects.filter(user_id=user_id).order_by(
+        'author_id'
+    ).values_list('author_id', flat=True)
+    keys = [follower_key(user_id), *map(author_key, authors)]
+    found = get_many(keys)
+    return hashlib.md5(
+        ':'.join(found[key] for key in keys).encode()
+    ).hexdigest()
+
+
+def post_keys(post, *group_ids):
+    """Ключи лент, в которых показывается пост.
+
+    Ленты подписчиков следуют за версией автора.
+    """
+    keys = {index_key(), author_key(post.author_id)}
+    keys.update(
+        group_key(group_id)
+        for group_id in (post.group_id, *group_ids) if group_id
+    )
+    return keys
+
+
+def group_keys(group_id):
+    """Ключи лент, где показывается название сообщества."""
+    from .models import Post
+    authors = Post.objects.filter(group_id=group_id).order_by().values_list(
+        'author_id', flat=True
+    ).distinct()
+    return {index_key(), group_key(group_id), *map(author_key, authors)}
+
+
+def user_keys(user_id):
+    """Ключи лент, где показывается имя пользователя: его посты
+    и страницы постов с его комментариями.
+    """
+    from .models import Post
+    groups = Post.objects.filter(
+        author_id=user_id, group__isnull=False
+    ).order_by().values_list('group_id', flat=True).distinct()
+    commented = Post.objects.filter(comments__author_id=user_id).order_by(
+    ).values_list('author_id', flat=True).distinct()
+    return {
+        index_key(), author_key(user_id),
+        *map(group_key, groups), *map(author_key, commented),
+    }
@@ -1,100 +1,189 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core import uploads
+from core.decorators import anonymous_page_cache
+
+from . import feed, page_state, search, streaming, thumbnails, versions
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post, User
+from .paginator import CursorPaginator, InvalidCursor, paginate
 
 
+@anonymous_page_cache(page_state.index)
 def index(request):
     """Возвращает главную страницу."""
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(
+    post_list = Post.objects.for_feed()
+    page = paginate(request, post_list)
+    return streaming.render(
         request,
         'index.html',
-        {'page': page, }
+        {
+            'page': page,
+            'feed_version': versions.get(versions.index_key()),
+        }
     )
 
 
+@anonymous_page_cache(page_state.group)
 def group_posts(request, slug):
     """Возвращает страницу сообщества с постами."""
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(
+    post_list = group.posts.for_feed()
+    page = paginate(request, post_list)
+    return streaming.render(
         request,
         'group.html',
         {
             'group': group,
             'page': page,
+            'feed_version': versions.get(versions.group_key(group.id)),
         }
     )
 
 
+def search_posts(request):
+    """Возвращает страницу поиска постов по ?q=.
+
+    Результаты отсортированы по релевантности и листаются
+    только курсором.
+    """
+    query = request.GET.get('q', '').strip()
+    paginator = CursorPaginator(
+        search.search(query), ordering=('-rank', '-id')
+    )
+    try:
+        page = paginator.cursor_page(request.GET.get('cursor'))
+    except InvalidCursor:
+        page = paginator.cursor_page()
+    return render(request, 'search.html', {'query': query, 'page': page})
+
+
 @login_required
 def new_post(request):
     """Возвращает страницу создания новой записи."""
-    form = PostForm(request.POST or None, files=request.FILES or None)
+    form = PostForm(request.POST or None, files=request.FILES or None,
+                    upload_too_large=uploads.too_large(request))
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        thumbnails.schedule(post)
         return redirect('index')
     return render(request, 'post_new.html', {'form': form})
 
 
+@anonymous_page_cache(page_state.profile)
 def profile(request, username):
     """Возвращает страницу профайла автора со всеми его постами."""
     post_author = get_object_or_404(
-        User, username=username
+        User.objects.select_related('stats'), username=username
     )
     following = request.user.is_authenticated and Follow.objects.filter(
         author=post_author,
         user=request.user
     ).exists()
-    post_list = post_author.posts.all()
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(
+    post_list = post_author.posts.for_feed()
+    page = paginate(request, post_list)
+    return streaming.render(
         request,
         'profile.html',
         {
             'post_author': post_author,
             'page': page,
             'following': following,
+            'is_owner': request.user == post_author,
+            'feed_version': versions.get(versions.author_key(post_author.id)),
         }
     )
 
 
+def _comment_page(request, post):
+    """Комментарии поста по ?cursor= и курсор следующей порции.
+
+    Первая порция - срез QuerySet без COUNT. Есть ли продолжение,
+    проверяет exists() за полной порцией, а не счётчик
+    post.comment_count, который может расходиться с таблицей.
+    """
+    paginator = CursorPaginator(
+        post.comments.select_related('author'),
+        per_page=settings.COMMENTS_PER_PAGE,
+        ordering=('created', 'id'),
+    )
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            page = paginator.cursor_page(cursor)
+        except InvalidCursor:
+            raise Http404('Некорректный курсор')
+        return page.object_list, page.next_cursor
+    comments = paginator.object_list[:paginator.per_page]
+    rows = list(comments)
+    if len(rows) == paginator.per_page and paginator.object_list[
+        paginator.per_page:
+    ].exists():
+        return comments, paginator.encode(rows[-1])
+    return comments, None
+
+
+@anonymous_page_cache(page_state.post)
 def post_view(request, username, post_id):
     """Возвращает страницу просмотра записи с комментариями."""
     post = get_object_or_404(
-        Post.objects.select_related('author').prefetch_related('comments'),
+        Post.objects.for_feed().select_related('author__stats'),
         pk=post_id, author__username=username
     )
     following = request.user.is_authenticated and Follow.objects.filter(
         author=post.author,
         user=request.user
     ).exists()
+    comments, next_cursor = _comment_page(request, post)
     form = CommentForm()
     return render(
         request,
         'post.html',
         {
             'post': post,
-            'comments': post.comments.all(),
+            'comments': comments,
+            'next_cursor': next_cursor,
             'form': form,
             'following': following,
         }
     )
 
 
+@anonymous_page_cache(page_state.post)
+def post_comments(request, username, post_id):
+    """Порция комментариев для подгрузки при прокрутке:
+    HTML-фрагмент или JSON при ?format=json.
+    """
+    post = get_object_or_404(
+        Post.objects.select_related('author'),
+        pk=post_id, author__username=username
+    )
+    comments, next_cursor = _comment_page(request, post)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created': comment.created,
+                }
+                for comment in comments
+            ],
+            'next_cursor': next_cursor,
+        })
+    return render(request, 'includes/comment_items.html', {
+        'post': post,
+        'comments': comments,
+        'next_cursor': next_cursor,
+    })
+
+
 @login_required
 def add_comment(request, username, post_id):
     """Добавляет комментарий к посту."""
@@ -121,9 +210,12 @@ def post_edit(request, username, post_id):
         Post, pk=post_id, author__username=username
     )
     form = PostForm(request.POST or None,
-                    files=request.FILES or None, instance=post)
+                    files=request.FILES or None, instance=post,
+                    upload_too_large=uploads.too_large(request))
     if form.is_valid():
         form.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post)
         return redirect(
             'post', username=username, post_id=post_id
         )
@@ -133,17 +225,19 @@ def post_edit(request, username, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(
-        author__following__user=request.user
+    if feed.pull(request.user):
+        versions.bump(versions.follower_key(request.user.id))
+    page = paginate(
+        request,
+        Post.objects.for_follower(request.user),
+        ordering=('-feed_pub_date', '-feed_post_id')
     )
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(
+    return streaming.render(
         request,
         'follow.html',
         {
             'page': page,
+            'feed_version': versions.follower_version(request.user.id),
         }
     )
 
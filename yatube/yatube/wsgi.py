@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+from core.staticfiles import StaticFilesApp  # noqa: E402
+from core.template_backends import warm_up  # noqa: E402
+
+warm_up()
+
+if settings.SERVE_STATIC:
+    application = StaticFilesApp(application)